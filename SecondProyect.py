@@ -1,11 +1,36 @@
 import os
+import io
+import sys
+import wave
+import json
+import gc
+import time
+import queue
+import socket
+import asyncio
+import shutil
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+import concurrent.futures
+from collections import OrderedDict
 import pygame
 from pygame import mixer
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
-from typing import Optional, Dict, List, Literal
+from typing import Optional, Dict, List, Literal, Iterator, Iterable, Callable
 from PIL import Image, ImageTk
-import time
+
+try:
+    from mutagen import File as MutagenFile
+except ImportError:
+    MutagenFile = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 COLOR_PRIMARIO = "#1DB954"  
 COLOR_SECUNDARIO = "#191414"  
@@ -17,6 +42,41 @@ COLOR_HOVER = "#535353"
 
 REPETIR_MODOS = ["Ninguno", "Una canción", "Toda la lista"]
 
+PRESUPUESTO_MEMORIA_LISTAS = 8 * 1024 * 1024  # bytes
+TAMANO_BASE_CANCION = 480  # Cancion + Nodo + fila de la instantánea + diccionarios de atributos
+
+TAMANO_PORTADA = (64, 64)
+TAMANO_MINIATURA = (24, 24)
+MAX_PORTADAS_MEMORIA = 512
+MAX_BYTES_PORTADAS = 16 * 1024 * 1024
+DIRECTORIO_PORTADAS = os.path.join(os.path.expanduser("~"), ".modern_player", "portadas")
+MAX_BYTES_PORTADAS_DISCO = 64 * 1024 * 1024
+TAMANO_BASE_ARCHIVO = 512  # bytes que se cuentan por archivo, para que los vacíos también ocupen
+MOSTRAR_MINIATURAS_LISTA = False
+ALTO_FILA_LISTA = 30  # píxeles; la tabla solo crea las filas que caben en pantalla
+NOMBRES_PORTADA_CARPETA = ["cover.jpg", "cover.png", "folder.jpg", "folder.png", "front.jpg"]
+
+# Directorio propio del usuario: en /tmp cualquiera podría ocupar la ruta antes
+DIRECTORIO_CONTROL = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(os.path.expanduser("~"), ".modern_player")
+RUTA_SOCKET_CONTROL = os.path.join(DIRECTORIO_CONTROL, "modern_player.sock")
+INTERVALO_COMANDOS_MS = 10  # solo si Tcl no admite hilos y no se puede despertar a Tk
+MAX_COMANDOS_POR_CICLO = 256
+MAX_BUFFER_SUSCRIPTOR = 256 * 1024  # bytes sin enviar antes de desconectar a un suscriptor lento
+
+TASA_ANALISIS = 11025  # Hz
+DURACION_ANALISIS = 60  # segundos analizados del centro de cada canción
+TAMANO_VENTANA = 2048
+SALTO_VENTANA = 512
+# tempo, centroide medio, desviación del centroide, sonoridad, 12 clases de croma
+DIMENSION_CARACTERISTICAS = 16
+PESOS_CARACTERISTICAS = [2.0, 1.5, 1.0, 1.5] + [0.5] * 12
+TAMANO_RADIO = 25
+
+DIRECTORIO_DIARIO = os.path.join(os.path.expanduser("~"), ".modern_player", "diario")
+INTERVALO_GRUPO_DIARIO = 0.05  # segundos que se acumulan entradas antes de cada fsync
+MAX_ENTRADAS_DIARIO = 100000  # entradas desde el último checkpoint antes de compactar
+TAMANO_BLOQUE_DIARIO = 1024 * 1024  # bytes leídos por bloque al reproducir el diario
+
 class Cancion:
     def __init__(self, titulo: str, artista: str, duracion: float, ruta_archivo: str, genero: str):
         self.titulo = titulo
@@ -38,6 +98,13 @@ class Cancion:
         self.artista = nuevo_artista
         self.duracion = nueva_duracion
         self.genero = nuevo_genero
+    
+    def tamano_estimado(self) -> int:
+        return (TAMANO_BASE_CANCION + sys.getsizeof(self.titulo) + sys.getsizeof(self.artista)
+                + sys.getsizeof(self.ruta_archivo) + sys.getsizeof(self.genero))
+    
+    def fila(self) -> tuple:
+        return (self.titulo, self.artista, self.duracion, self.ruta_archivo, self.genero)
 
 class Nodo:
     def __init__(self, cancion: Cancion):
@@ -53,10 +120,29 @@ class ListaReproduccion:
         self.modo_repeticion: Literal["Ninguno", "Una canción", "Toda la lista"] = "Ninguno"
         self.volumen = 0.7
         self.duracion_total = 0.0
+        self.longitud = 0
+        # Se incrementa con cada cambio de contenido (agregar, eliminar, editar)
+        self.generacion = 0
+        # Filas inmutables (titulo, artista, duracion, ruta, genero) en el orden de la
+        # lista. obtener_instantanea() entrega esta misma lista y la marca compartida;
+        # el siguiente cambio trabaja sobre una copia (copia en escritura)
+        self._filas: List[tuple] = []
+        self._filas_compartidas = False
+        self.tamano_memoria = 0  # bytes estimados, se actualiza en cada cambio
+        # Lo asigna GestorListas para registrar cada cambio en el diario
+        self.al_cambiar: Optional[Callable[[dict], None]] = None
+    
+    def __len__(self) -> int:
+        return self.longitud
     
     def agregar_cancion(self, cancion: Cancion) -> None:
         nuevo_nodo = Nodo(cancion)
         self.duracion_total += cancion.duracion
+        self.longitud += 1
+        self.generacion += 1
+        self._copiar_filas_si_compartidas()
+        self._filas.append(cancion.fila())
+        self.tamano_memoria += cancion.tamano_estimado()
         
         if self.cabeza is None:
             self.cabeza = nuevo_nodo
@@ -69,15 +155,25 @@ class ListaReproduccion:
             nuevo_nodo.anterior = ultimo
             nuevo_nodo.siguiente = self.cabeza
             self.cabeza.anterior = nuevo_nodo
+        
+        if self.al_cambiar:
+            self.al_cambiar({"op": "agregar_cancion", "cancion": [cancion.titulo, cancion.artista, cancion.duracion,
+                                                                  cancion.ruta_archivo, cancion.genero]})
     
     def eliminar_cancion(self, titulo: str) -> bool:
         if self.cabeza is None:
             return False
         
         temp = self.cabeza
+        indice = 0
         while True:
             if temp.cancion.titulo == titulo:
                 self.duracion_total -= temp.cancion.duracion
+                self.longitud -= 1
+                self.generacion += 1
+                self._copiar_filas_si_compartidas()
+                del self._filas[indice]
+                self.tamano_memoria -= temp.cancion.tamano_estimado()
                 
                 if temp.siguiente == temp:  # Único nodo
                     self.cabeza = None
@@ -92,26 +188,106 @@ class ListaReproduccion:
                     if self.actual == temp:
                         self.actual = temp.siguiente
                 
+                if self.al_cambiar:
+                    self.al_cambiar({"op": "eliminar_cancion", "titulo": titulo})
                 return True
             
             temp = temp.siguiente
+            indice += 1
             if temp == self.cabeza:
                 break
         
         return False
     
+    def editar_cancion(self, cancion: Cancion, nuevo_titulo: str, nuevo_artista: str, nueva_duracion: float,
+                       nuevo_genero: str) -> bool:
+        # La canción pudo eliminarse mientras se editaba (p. ej. desde el control remoto)
+        indice = self._indice_de(cancion)
+        if indice < 0:
+            return False
+        
+        titulo_anterior = cancion.titulo
+        self.duracion_total += nueva_duracion - cancion.duracion
+        self.tamano_memoria -= cancion.tamano_estimado()
+        cancion.editar(nuevo_titulo, nuevo_artista, nueva_duracion, nuevo_genero)
+        self.tamano_memoria += cancion.tamano_estimado()
+        self.generacion += 1
+        self._copiar_filas_si_compartidas()
+        self._filas[indice] = cancion.fila()
+        if self.al_cambiar:
+            # La posición distingue entre canciones con el mismo título al reproducir el diario
+            self.al_cambiar({"op": "editar_cancion", "indice": indice, "titulo": titulo_anterior,
+                             "cambios": [nuevo_titulo, nuevo_artista, nueva_duracion, nuevo_genero]})
+        return True
+    
     def listar_canciones(self) -> List[Cancion]:
-        canciones = []
+        return list(self.iterar_canciones())
+    
+    def iterar_canciones(self) -> Iterator[Cancion]:
+        # No es seguro si la lista cambia durante el recorrido; para eso usar obtener_instantanea()
         if self.cabeza is None:
-            return canciones
+            return
+        
+        temp = self.cabeza
+        while True:
+            yield temp.cancion
+            temp = temp.siguiente
+            if temp == self.cabeza:
+                break
+    
+    def obtener_filas(self, inicio: int, cantidad: int) -> List[tuple]:
+        # O(cantidad) sobre las filas; preferible a obtener_ventana() cuando bastan los datos
+        inicio = max(0, inicio)
+        return self._filas[inicio:inicio + max(0, cantidad)]
+    
+    def obtener_ventana(self, inicio: int, cantidad: int) -> List[Cancion]:
+        inicio = max(0, inicio)
+        fin = min(self.longitud, inicio + cantidad)
+        if inicio >= fin:
+            return []
+        
+        # Se recorre desde el extremo más cercano
+        if inicio <= self.longitud - fin:
+            temp = self.cabeza
+            for _ in range(inicio):
+                temp = temp.siguiente
+        else:
+            temp = self.cabeza.anterior
+            for _ in range(self.longitud - 1 - inicio):
+                temp = temp.anterior
+        
+        ventana = []
+        for _ in range(fin - inicio):
+            ventana.append(temp.cancion)
+            temp = temp.siguiente
+        return ventana
+    
+    def obtener_instantanea(self) -> List[tuple]:
+        # O(1): se entrega la lista de filas actual y el próximo cambio la copia antes
+        # de modificarla. Las filas son tuplas, así que una edición posterior tampoco
+        # altera la instantánea. Quien la recibe no debe modificarla.
+        self._filas_compartidas = True
+        return self._filas
+    
+    def _copiar_filas_si_compartidas(self) -> None:
+        if self._filas_compartidas:
+            self._filas = list(self._filas)
+            self._filas_compartidas = False
+    
+    def _indice_de(self, cancion: Cancion) -> int:
+        if self.cabeza is None:
+            return -1
         
         temp = self.cabeza
+        indice = 0
         while True:
-            canciones.append(temp.cancion)
+            if temp.cancion is cancion:
+                return indice
             temp = temp.siguiente
+            indice += 1
             if temp == self.cabeza:
                 break
-        return canciones
+        return -1
     
     def buscar_cancion(self, titulo: str) -> Optional[Cancion]:
         if self.cabeza is None:
@@ -205,37 +381,1078 @@ class ListaReproduccion:
         minutos = int(self.duracion_total)
         segundos = int((self.duracion_total - minutos) * 60)
         return f"{minutos}:{segundos:02d}"
+    
+    def tamano_estimado(self) -> int:
+        return self.tamano_memoria
+    
+    def serializar(self) -> dict:
+        canciones = []
+        indice_actual = -1
+        temp = self.cabeza
+        i = 0
+        while temp is not None:
+            c = temp.cancion
+            canciones.append([c.titulo, c.artista, c.duracion, c.ruta_archivo, c.genero])
+            if temp == self.actual:
+                indice_actual = i
+            i += 1
+            temp = temp.siguiente
+            if temp == self.cabeza:
+                break
+        return {
+            "canciones": canciones,
+            "actual": indice_actual,
+            "modo": self.modo_repeticion,
+            "volumen": self.volumen
+        }
+    
+    @staticmethod
+    def deserializar(datos: dict) -> 'ListaReproduccion':
+        lista = ListaReproduccion()
+        for titulo, artista, duracion, ruta, genero in datos["canciones"]:
+            lista.agregar_cancion(Cancion(titulo, artista, duracion, ruta, genero))
+        
+        indice_actual = datos.get("actual", 0)
+        if indice_actual < 0:
+            lista.actual = None
+        elif lista.cabeza is not None:
+            nodo = lista.cabeza
+            for _ in range(indice_actual):
+                nodo = nodo.siguiente
+            lista.actual = nodo
+        lista.modo_repeticion = datos.get("modo", "Ninguno")
+        lista.volumen = datos.get("volumen", 0.7)
+        return lista
+
+# Diario de escritura anticipada: cada cambio de GestorListas/ListaReproduccion se
+# agrega como una línea JSON. Un hilo escribe las entradas por lotes con un solo
+# fsync por lote, y al compactar se guarda un checkpoint completo y se borran los
+# segmentos del diario que ya quedaron incluidos en él.
+class DiarioCambios:
+    def __init__(self, directorio: str = DIRECTORIO_DIARIO, intervalo: float = INTERVALO_GRUPO_DIARIO,
+                 max_entradas: int = MAX_ENTRADAS_DIARIO):
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+        self.intervalo = intervalo
+        self.max_entradas = max_entradas
+        self.ruta_checkpoint = os.path.join(directorio, "checkpoint.json")
+        self.entradas_desde_checkpoint = 0
+        self._secuencia = 0
+        self._secuencia_durable = 0
+        self._segmento = 0
+        self._archivo = None
+        self._pendientes: List[str] = []
+        self._lotes_anteriores: List[tuple] = []  # (archivo, lineas) de segmentos ya rotados
+        self._compactando = False
+        self._cerrado = False
+        self.error: Optional[Exception] = None  # fallo de escritura que detuvo al escritor
+        self.error_compactacion: Optional[Exception] = None  # último checkpoint que no se pudo guardar
+        self._condicion = threading.Condition()
+        self._escritor: Optional[threading.Thread] = None
+    
+    def recuperar(self) -> "OrderedDict[str, ListaReproduccion]":
+        # Todos los objetos creados siguen vivos; pausar el recolector evita que los
+        # recorra una y otra vez y reduce el tiempo de recuperación a la mitad
+        recolector_activo = gc.isenabled()
+        gc.disable()
+        try:
+            listas = self._reproducir()
+        finally:
+            if recolector_activo:
+                gc.enable()
+        
+        self._archivo = self._abrir_segmento()
+        self._escritor = threading.Thread(target=self._escribir, daemon=True)
+        self._escritor.start()
+        return listas
+    
+    def registrar(self, entrada: dict) -> None:
+        with self._condicion:
+            if self.error is not None:
+                # El escritor se detuvo: el cambio ya está en memoria y el fallo se informa
+                # desde sincronizar()/cerrar() y en la interfaz, no a quien modificó la lista
+                return
+            self._secuencia += 1
+            entrada["s"] = self._secuencia
+            self._pendientes.append(json.dumps(entrada, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self.entradas_desde_checkpoint += 1
+            self._condicion.notify_all()
+    
+    def sincronizar(self) -> None:
+        with self._condicion:
+            objetivo = self._secuencia
+            while (self._secuencia_durable < objetivo and self.error is None
+                   and self._escritor is not None and self._escritor.is_alive()):
+                self._condicion.wait()
+            self._comprobar_error()
+    
+    def necesita_compactar(self) -> bool:
+        return not self._compactando and self.entradas_desde_checkpoint >= self.max_entradas
+    
+    def compactar(self, listas: List[tuple]) -> None:
+        # listas: (nombre, filas de obtener_instantanea()) o (nombre, bytes de una lista desalojada)
+        with self._condicion:
+            if self._compactando:
+                return
+            self._compactando = True
+            secuencia = self._secuencia
+            anteriores = [ruta for _, ruta in self._segmentos()]
+            self._lotes_anteriores.append((self._archivo, self._pendientes))
+            self._pendientes = []
+            self._archivo = self._abrir_segmento()
+            self.entradas_desde_checkpoint = 0
+            self._condicion.notify_all()
+        threading.Thread(target=self._escribir_checkpoint, args=(listas, secuencia, anteriores), daemon=True).start()
+    
+    def cerrar(self) -> None:
+        try:
+            self.sincronizar()
+        finally:
+            with self._condicion:
+                self._cerrado = True
+                self._condicion.notify_all()
+            if self._escritor is not None:
+                self._escritor.join()
+    
+    def _reproducir(self) -> "OrderedDict[str, ListaReproduccion]":
+        listas: "OrderedDict[str, ListaReproduccion]" = OrderedDict()
+        secuencia = 0
+        if os.path.exists(self.ruta_checkpoint):
+            with open(self.ruta_checkpoint, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+            secuencia = checkpoint["secuencia"]
+            for nombre, filas in checkpoint["listas"]:
+                listas[nombre] = ListaReproduccion.deserializar({"canciones": filas})
+        
+        for numero, ruta in self._segmentos():
+            self._segmento = max(self._segmento, numero)
+            valido = 0
+            with open(ruta, "rb") as f:
+                while True:
+                    bloque = f.readlines(TAMANO_BLOQUE_DIARIO)
+                    if not bloque:
+                        break
+                    
+                    # Una línea incompleta o corrupta al final es una escritura interrumpida
+                    interrumpido = not bloque[-1].endswith(b"\n")
+                    if interrumpido:
+                        bloque.pop()
+                    try:
+                        entradas = json.loads(b"[" + b",".join(bloque) + b"]")
+                    except ValueError:
+                        entradas = []
+                        for linea in bloque:
+                            try:
+                                entradas.append(json.loads(linea))
+                            except ValueError:
+                                break
+                        bloque = bloque[:len(entradas)]
+                        interrumpido = True
+                    
+                    valido += sum(map(len, bloque))
+                    for entrada in entradas:
+                        if entrada["s"] > secuencia:
+                            try:
+                                self._aplicar(listas, entrada)
+                            except (KeyError, IndexError, TypeError, ValueError):
+                                pass  # una entrada que ya no aplica no impide recuperar el resto
+                            secuencia = entrada["s"]
+                            self.entradas_desde_checkpoint += 1
+                    if interrumpido:
+                        break
+            if valido < os.path.getsize(ruta):
+                with open(ruta, "r+b") as f:
+                    f.truncate(valido)
+        
+        self._secuencia = self._secuencia_durable = secuencia
+        return listas
+    
+    def _escribir(self) -> None:
+        while True:
+            with self._condicion:
+                while not self._pendientes and not self._lotes_anteriores and not self._cerrado:
+                    self._condicion.wait()
+                if self._cerrado and not self._pendientes and not self._lotes_anteriores:
+                    self._archivo.close()
+                    return
+            
+            # Ventana de agrupación: las entradas que lleguen mientras tanto comparten el fsync
+            time.sleep(self.intervalo)
+            with self._condicion:
+                lotes = self._lotes_anteriores + [(self._archivo, self._pendientes)]
+                self._lotes_anteriores = []
+                self._pendientes = []
+                secuencia = self._secuencia
+            
+            try:
+                for archivo, lineas in lotes:
+                    if lineas:
+                        archivo.write("".join(lineas).encode("utf-8"))
+                        archivo.flush()
+                        os.fsync(archivo.fileno())
+                for archivo, _ in lotes[:-1]:
+                    archivo.close()
+            except (OSError, ValueError) as e:  # ValueError: el archivo se cerró
+                with self._condicion:
+                    self.error = e
+                    self._condicion.notify_all()
+                return
+            
+            with self._condicion:
+                self._secuencia_durable = secuencia
+                self._condicion.notify_all()
+    
+    def _escribir_checkpoint(self, listas: List[tuple], secuencia: int, anteriores: List[str]) -> None:
+        try:
+            datos = []
+            for nombre, contenido in listas:
+                if isinstance(contenido, bytes):
+                    filas = json.loads(contenido)["canciones"]
+                else:
+                    filas = contenido
+                datos.append([nombre, filas])
+            
+            temporal = self.ruta_checkpoint + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"secuencia": secuencia, "listas": datos}, ensure_ascii=False, separators=(",", ":")))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, self.ruta_checkpoint)
+            self._sincronizar_directorio()
+            
+            # Los segmentos anteriores ya están en el checkpoint
+            self.sincronizar()
+            for ruta in anteriores:
+                os.remove(ruta)
+        except Exception as e:
+            # Los segmentos siguen en disco, así que no se pierde nada; se avisa igualmente
+            self.error_compactacion = e
+        finally:
+            self._compactando = False
+    
+    def _comprobar_error(self) -> None:
+        if self.error is not None:
+            raise RuntimeError(f"No se pudo escribir el diario de cambios: {self.error}") from self.error
+    
+    def _abrir_segmento(self):
+        self._segmento += 1
+        archivo = open(os.path.join(self.directorio, f"diario.{self._segmento:06d}.log"), "ab")
+        self._sincronizar_directorio()
+        return archivo
+    
+    def _segmentos(self) -> List[tuple]:
+        segmentos = []
+        for nombre in os.listdir(self.directorio):
+            partes = nombre.split(".")
+            if len(partes) == 3 and partes[0] == "diario" and partes[2] == "log" and partes[1].isdigit():
+                segmentos.append((int(partes[1]), os.path.join(self.directorio, nombre)))
+        return sorted(segmentos)
+    
+    def _sincronizar_directorio(self) -> None:
+        if os.name != "posix":
+            return
+        descriptor = os.open(self.directorio, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+    
+    @staticmethod
+    def _aplicar(listas: "OrderedDict[str, ListaReproduccion]", entrada: dict) -> None:
+        operacion = entrada["op"]
+        nombre = entrada["lista"]
+        if operacion == "crear_lista":
+            listas[nombre] = ListaReproduccion.deserializar({"canciones": entrada["canciones"]})
+            return
+        if operacion == "eliminar_lista":
+            listas.pop(nombre, None)
+            return
+        
+        lista = listas.get(nombre)
+        if lista is None:
+            return
+        if operacion == "agregar_cancion":
+            lista.agregar_cancion(Cancion(*entrada["cancion"]))
+        elif operacion == "eliminar_cancion":
+            lista.eliminar_cancion(entrada["titulo"])
+        elif operacion == "editar_cancion":
+            if "indice" in entrada:
+                ventana = lista.obtener_ventana(entrada["indice"], 1) if entrada["indice"] >= 0 else []
+                cancion = ventana[0] if ventana else None
+            else:
+                cancion = lista.buscar_cancion(entrada["titulo"])
+            if cancion:
+                lista.editar_cancion(cancion, *entrada["cambios"])
+
+def medir_recuperacion_diario(total: int = 1000000) -> None:
+    directorio = tempfile.mkdtemp(prefix="modern_player_diario_")
+    try:
+        diario = DiarioCambios(directorio, max_entradas=total + 1)
+        diario.recuperar()
+        diario.registrar({"op": "crear_lista", "lista": "medicion", "canciones": []})
+        inicio = time.perf_counter()
+        for i in range(total):
+            diario.registrar({"op": "agregar_cancion", "lista": "medicion",
+                              "cancion": [f"Canción {i}", "Artista", 3.5, f"/musica/{i}.mp3", "Rock"]})
+        diario.cerrar()
+        escritura = time.perf_counter() - inicio
+        
+        inicio = time.perf_counter()
+        diario = DiarioCambios(directorio, max_entradas=total + 1)
+        listas = diario.recuperar()
+        recuperacion = time.perf_counter() - inicio
+        diario.cerrar()
+        
+        print(f"Escritura: {total} entradas en {escritura:.3f} s")
+        print(f"Recuperación: {len(listas['medicion'])} canciones en {recuperacion:.3f} s")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
 
 class GestorListas:
-    def __init__(self):
-        self.listas: Dict[str, ListaReproduccion] = {}
+    def __init__(self, presupuesto_memoria: int = PRESUPUESTO_MEMORIA_LISTAS, directorio_cache: Optional[str] = None,
+                 diario: Optional[DiarioCambios] = None):
+        # None en self.listas indica una lista desalojada a disco
+        self.listas: Dict[str, Optional[ListaReproduccion]] = {}
         self.lista_activa: Optional[ListaReproduccion] = None
+        self.presupuesto_memoria = presupuesto_memoria
+        self.directorio_cache = directorio_cache
+        self._cache_temporal = False  # True si el directorio lo creó este gestor
+        self._recientes: "OrderedDict[str, None]" = OrderedDict()
+        self.desalojos = 0
+        self.cargas_desde_disco = 0
+        self.diario = None
+        
+        if diario is not None:
+            for nombre, lista in diario.recuperar().items():
+                self.agregar_lista(nombre, lista)
+            self.diario = diario
+            for nombre, lista in self.listas.items():
+                if lista is not None:
+                    self._observar(nombre, lista)
+            if diario.necesita_compactar():
+                self.compactar()
     
     def crear_lista(self, nombre: str) -> bool:
+        return self.agregar_lista(nombre, ListaReproduccion())
+    
+    def agregar_lista(self, nombre: str, lista: ListaReproduccion) -> bool:
         if nombre in self.listas:
             return False
-        self.listas[nombre] = ListaReproduccion()
+        self.listas[nombre] = lista
+        if self.diario is not None:
+            self._registrar_cambio(nombre, {"op": "crear_lista", "canciones": lista.serializar()["canciones"]})
+            self._observar(nombre, lista)
+        self._marcar_uso(nombre)
+        self.aplicar_presupuesto()
         return True
     
+    def obtener_lista(self, nombre: str) -> Optional[ListaReproduccion]:
+        if nombre not in self.listas:
+            return None
+        
+        if self.listas[nombre] is None:
+            ruta = self._ruta_cache(nombre)
+            with open(ruta, "r", encoding="utf-8") as f:
+                self.listas[nombre] = ListaReproduccion.deserializar(json.load(f))
+            os.remove(ruta)
+            self.cargas_desde_disco += 1
+            self._observar(nombre, self.listas[nombre])
+        
+        self._marcar_uso(nombre)
+        return self.listas[nombre]
+    
     def seleccionar_lista(self, nombre: str) -> bool:
         if nombre not in self.listas:
             return False
-        self.lista_activa = self.listas[nombre]
+        self.lista_activa = self.obtener_lista(nombre)
+        self.aplicar_presupuesto()
         return True
     
     def eliminar_lista(self, nombre: str) -> bool:
         if nombre not in self.listas:
             return False
         
-        if self.lista_activa == self.listas[nombre]:
-            self.lista_activa.detener()
-            self.lista_activa = None
+        lista = self.listas[nombre]
+        if lista is None:
+            os.remove(self._ruta_cache(nombre))
+        else:
+            lista.al_cambiar = None
+            if self.lista_activa == lista:
+                self.lista_activa.detener()
+                self.lista_activa = None
         
         del self.listas[nombre]
+        self._recientes.pop(nombre, None)
+        if self.diario is not None:
+            self._registrar_cambio(nombre, {"op": "eliminar_lista"})
         return True
     
     def obtener_listas(self) -> List[str]:
         return list(self.listas.keys())
+    
+    def canciones_biblioteca(self) -> Iterator[Cancion]:
+        # Las listas en disco se leen sin volver a cargarlas en memoria
+        for nombre, lista in list(self.listas.items()):
+            if lista is not None:
+                for fila in lista.obtener_instantanea():
+                    yield Cancion(*fila)
+            else:
+                with open(self._ruta_cache(nombre), "r", encoding="utf-8") as f:
+                    for titulo, artista, duracion, ruta, genero in json.load(f)["canciones"]:
+                        yield Cancion(titulo, artista, duracion, ruta, genero)
+    
+    def aplicar_presupuesto(self) -> None:
+        tamanos = {nombre: self.listas[nombre].tamano_estimado() for nombre in self._recientes}
+        memoria = sum(tamanos.values())
+        
+        # Se desaloja desde la menos usada recientemente
+        for nombre in list(self._recientes):
+            if memoria <= self.presupuesto_memoria:
+                break
+            lista = self.listas[nombre]
+            if lista is self.lista_activa or lista.esta_reproduciendo:
+                continue
+            self._desalojar(nombre)
+            memoria -= tamanos[nombre]
+    
+    def obtener_estadisticas_memoria(self) -> Dict[str, int]:
+        return {
+            "residentes": len(self._recientes),
+            "en_disco": len(self.listas) - len(self._recientes),
+            "memoria_estimada": sum(self.listas[n].tamano_estimado() for n in self._recientes),
+            "presupuesto": self.presupuesto_memoria,
+            "desalojos": self.desalojos,
+            "cargas_desde_disco": self.cargas_desde_disco
+        }
+    
+    def compactar(self) -> None:
+        # Se toma una instantánea en este hilo; la escritura del checkpoint va en segundo plano
+        listas = []
+        for nombre, lista in self.listas.items():
+            if lista is not None:
+                listas.append((nombre, lista.obtener_instantanea()))
+            else:
+                with open(self._ruta_cache(nombre), "rb") as f:
+                    listas.append((nombre, f.read()))
+        self.diario.compactar(listas)
+    
+    def cerrar(self) -> None:
+        try:
+            if self.diario is not None:
+                self.diario.cerrar()
+        finally:
+            # Las listas desalojadas solo sirven durante esta sesión
+            if self._cache_temporal:
+                shutil.rmtree(self.directorio_cache, ignore_errors=True)
+                self.directorio_cache = None
+                self._cache_temporal = False
+    
+    def _observar(self, nombre: str, lista: ListaReproduccion) -> None:
+        if self.diario is not None:
+            lista.al_cambiar = lambda entrada: self._registrar_cambio(nombre, entrada)
+    
+    def _registrar_cambio(self, nombre: str, entrada: dict) -> None:
+        entrada["lista"] = nombre
+        self.diario.registrar(entrada)
+        if self.diario.necesita_compactar():
+            self.compactar()
+    
+    def _marcar_uso(self, nombre: str) -> None:
+        self._recientes[nombre] = None
+        self._recientes.move_to_end(nombre)
+    
+    def _desalojar(self, nombre: str) -> None:
+        with open(self._ruta_cache(nombre), "w", encoding="utf-8") as f:
+            # json.dumps usa el codificador en C; json.dump escribe por fragmentos y es mucho más lento
+            f.write(json.dumps(self.listas[nombre].serializar(), ensure_ascii=False, separators=(",", ":")))
+        self.listas[nombre] = None
+        del self._recientes[nombre]
+        self.desalojos += 1
+    
+    def _ruta_cache(self, nombre: str) -> str:
+        if self.directorio_cache is None:
+            self.directorio_cache = tempfile.mkdtemp(prefix="modern_player_listas_")
+            self._cache_temporal = True
+        os.makedirs(self.directorio_cache, exist_ok=True)
+        return os.path.join(self.directorio_cache, hashlib.sha1(nombre.encode("utf-8")).hexdigest() + ".json")
+
+class CachePortadas:
+    def __init__(self, directorio_cache: Optional[str] = None, max_imagenes: int = MAX_PORTADAS_MEMORIA,
+                 max_bytes: int = MAX_BYTES_PORTADAS, max_bytes_disco: int = MAX_BYTES_PORTADAS_DISCO):
+        if directorio_cache is None:
+            directorio_cache = DIRECTORIO_PORTADAS
+        os.makedirs(directorio_cache, mode=0o700, exist_ok=True)
+        self.directorio_cache = directorio_cache
+        self.max_imagenes = max_imagenes
+        self.max_bytes = max_bytes
+        self.bytes_en_memoria = 0
+        self.max_bytes_disco = max_bytes_disco
+        self._bytes_disco = 0  # solo lo usa el hilo de trabajo
+        # Solo se accede desde el hilo de Tk
+        self._imagenes: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._callbacks: Dict[tuple, list] = {}
+        # Vista más reciente que pidió cada clave (None: no caduca). Lo escribe el
+        # hilo de Tk y lo consulta el de trabajo para descartar filas que ya no se ven
+        self.vista = 0
+        self._vigencia: Dict[tuple, Optional[int]] = {}
+        # Comunicación con el hilo de trabajo; LIFO para atender primero lo último visible
+        self._solicitudes: "queue.LifoQueue[tuple]" = queue.LifoQueue()
+        self._resultados: "queue.Queue[tuple]" = queue.Queue()
+        threading.Thread(target=self._trabajar, daemon=True).start()
+    
+    def nueva_vista(self) -> int:
+        self.vista += 1
+        return self.vista
+    
+    def solicitar(self, ruta: str, tamano: tuple, callback, vista: Optional[int] = None) -> None:
+        clave = (ruta, tamano)
+        if clave in self._imagenes:
+            self._imagenes.move_to_end(clave)
+            callback(self._imagenes[clave][0])
+            return
+        
+        if clave in self._callbacks:
+            self._callbacks[clave].append(callback)
+            if self._vigencia.get(clave) is not None:
+                self._vigencia[clave] = vista
+        else:
+            self._callbacks[clave] = [callback]
+            self._vigencia[clave] = vista
+            self._solicitudes.put(clave)
+    
+    def procesar_resultados(self) -> None:
+        while True:
+            try:
+                clave, imagen, cancelada = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            
+            if cancelada:
+                if self._vigente(clave):  # Se volvió a pedir mientras se descartaba
+                    self._solicitudes.put(clave)
+                else:
+                    self._callbacks.pop(clave, None)
+                    self._vigencia.pop(clave, None)
+                continue
+            
+            self._vigencia.pop(clave, None)
+            foto = ImageTk.PhotoImage(imagen) if imagen is not None else None
+            self._guardar(clave, foto, imagen.width * imagen.height * 4 if imagen is not None else 0)
+            for callback in self._callbacks.pop(clave, []):
+                callback(foto)
+    
+    def _guardar(self, clave: tuple, foto, tamano: int) -> None:
+        self._imagenes[clave] = (foto, tamano)
+        self.bytes_en_memoria += tamano
+        while self._imagenes and (len(self._imagenes) > self.max_imagenes or self.bytes_en_memoria > self.max_bytes):
+            _, (_, tamano_desalojado) = self._imagenes.popitem(last=False)
+            self.bytes_en_memoria -= tamano_desalojado
+    
+    def _vigente(self, clave: tuple) -> bool:
+        vista = self._vigencia.get(clave)
+        return vista is None or vista == self.vista
+    
+    def _trabajar(self) -> None:
+        self._podar_disco()
+        while True:
+            clave = self._solicitudes.get()
+            if not self._vigente(clave):
+                self._resultados.put((clave, None, True))
+                continue
+            
+            try:
+                imagen = self._cargar_miniatura(*clave)
+            except Exception:
+                imagen = None
+            self._resultados.put((clave, imagen, False))
+    
+    def _cargar_miniatura(self, ruta: str, tamano: tuple) -> Optional[Image.Image]:
+        marca = f"{ruta}|{os.path.getmtime(ruta)}|{tamano[0]}x{tamano[1]}"
+        ruta_cache = os.path.join(self.directorio_cache, hashlib.sha1(marca.encode("utf-8")).hexdigest() + ".png")
+        
+        if os.path.exists(ruta_cache):
+            os.utime(ruta_cache)  # la poda borra primero las usadas hace más tiempo
+            if os.path.getsize(ruta_cache) == 0:  # Ya se sabe que no tiene portada
+                return None
+            with Image.open(ruta_cache) as imagen:
+                imagen.load()
+                return imagen.copy()
+        
+        datos = extraer_portada(ruta)
+        if datos is None:
+            open(ruta_cache, "wb").close()
+            imagen = None
+        else:
+            with Image.open(io.BytesIO(datos)) as original:
+                imagen = original.convert("RGB")
+            imagen.thumbnail(tamano, Image.LANCZOS)
+            imagen.save(ruta_cache, "PNG")
+        
+        self._bytes_disco += os.path.getsize(ruta_cache) + TAMANO_BASE_ARCHIVO
+        if self._bytes_disco > self.max_bytes_disco:
+            self._podar_disco()
+        return imagen
+    
+    def _podar_disco(self) -> None:
+        # Se borran las miniaturas usadas hace más tiempo hasta bajar a 3/4 del límite
+        try:
+            archivos = []
+            for entrada in os.scandir(self.directorio_cache):
+                if entrada.name.endswith(".png") and entrada.is_file():
+                    info = entrada.stat()
+                    archivos.append((info.st_mtime, info.st_size + TAMANO_BASE_ARCHIVO, entrada.path))
+        except OSError:
+            return
+        
+        total = sum(tamano for _, tamano, _ in archivos)
+        if total > self.max_bytes_disco:
+            archivos.sort()
+            for _, tamano, ruta in archivos:
+                if total <= self.max_bytes_disco * 3 // 4:
+                    break
+                try:
+                    os.remove(ruta)
+                except OSError:
+                    continue
+                total -= tamano
+        self._bytes_disco = total
+
+def extraer_portada(ruta: str) -> Optional[bytes]:
+    if MutagenFile is not None:
+        try:
+            audio = MutagenFile(ruta)
+        except Exception:
+            audio = None
+        
+        if audio is not None:
+            if getattr(audio, "pictures", None):  # FLAC
+                return audio.pictures[0].data
+            if audio.tags is not None:
+                for clave in audio.tags.keys():
+                    if clave.startswith("APIC"):  # ID3 (MP3, WAV)
+                        return audio.tags[clave].data
+                    if clave == "covr":  # MP4
+                        return bytes(audio.tags[clave][0])
+    
+    carpeta = os.path.dirname(ruta)
+    for nombre in NOMBRES_PORTADA_CARPETA:
+        ruta_imagen = os.path.join(carpeta, nombre)
+        if os.path.exists(ruta_imagen):
+            with open(ruta_imagen, "rb") as f:
+                return f.read()
+    return None
+
+def leer_audio(ruta: str):
+    if ruta.lower().endswith(".wav"):
+        with wave.open(ruta, "rb") as archivo:
+            tasa = archivo.getframerate()
+            canales = archivo.getnchannels()
+            ancho = archivo.getsampwidth()
+            limite = tasa * DURACION_ANALISIS
+            archivo.setpos(max(0, (archivo.getnframes() - limite) // 2))
+            datos = archivo.readframes(limite)
+        
+        if ancho == 1:
+            muestras = np.frombuffer(datos, dtype=np.uint8).astype(np.float32) - 128
+        elif ancho == 2:
+            muestras = np.frombuffer(datos, dtype="<i2").astype(np.float32)
+        elif ancho == 4:
+            muestras = np.frombuffer(datos, dtype="<i4").astype(np.float32)
+        else:
+            return None, tasa
+    else:
+        # MP3/OGG se decodifican con el mezclador de pygame del proceso de análisis
+        tasa, _, canales = mixer.get_init()
+        muestras = pygame.sndarray.array(mixer.Sound(ruta)).astype(np.float32)
+        limite = tasa * DURACION_ANALISIS
+        inicio = max(0, (len(muestras) - limite) // 2)
+        muestras = muestras[inicio:inicio + limite]
+    
+    muestras = muestras.reshape(-1, canales).mean(axis=1)
+    factor = max(1, tasa // TASA_ANALISIS)
+    muestras = muestras[:len(muestras) // factor * factor].reshape(-1, factor).mean(axis=1)
+    return muestras, tasa / factor
+
+def calcular_caracteristicas(ruta: str):
+    try:
+        senal, tasa = leer_audio(ruta)
+    except Exception:
+        return None
+    if senal is None or len(senal) < TAMANO_VENTANA * 2:
+        return None
+    
+    senal = senal - senal.mean()
+    tramas = np.lib.stride_tricks.sliding_window_view(senal, TAMANO_VENTANA)[::SALTO_VENTANA]
+    espectro = np.abs(np.fft.rfft(tramas * np.hanning(TAMANO_VENTANA), axis=1)).astype(np.float32)
+    frecuencias = np.fft.rfftfreq(TAMANO_VENTANA, 1.0 / tasa)
+    
+    centroide = (espectro @ frecuencias) / (espectro.sum(axis=1) + 1e-9)
+    sonoridad = 20 * np.log10(np.sqrt(np.mean(senal ** 2)) + 1e-9)
+    
+    # Tempo: autocorrelación del flujo espectral entre 60 y 200 BPM
+    flujo = np.maximum(np.diff(espectro, axis=0), 0).sum(axis=1)
+    flujo -= flujo.mean()
+    autocorrelacion = np.fft.irfft(np.abs(np.fft.rfft(flujo, 2 * len(flujo))) ** 2)[:len(flujo)]
+    tramas_por_segundo = tasa / SALTO_VENTANA
+    retardo_min = max(1, int(tramas_por_segundo * 60 / 200))
+    retardo_max = min(len(autocorrelacion) - 1, int(tramas_por_segundo * 60 / 60))
+    tempo = 0.0
+    if retardo_max > retardo_min:
+        retardo = retardo_min + int(np.argmax(autocorrelacion[retardo_min:retardo_max + 1]))
+        tempo = 60 * tramas_por_segundo / retardo
+    
+    validas = (frecuencias >= 55) & (frecuencias <= 5000)
+    clases = np.round(69 + 12 * np.log2(frecuencias[validas] / 440)).astype(int) % 12
+    croma = np.bincount(clases, weights=(espectro[:, validas] ** 2).sum(axis=0), minlength=12)
+    croma /= croma.sum() + 1e-9
+    
+    return np.concatenate([[tempo, centroide.mean(), centroide.std(), sonoridad], croma]).astype(np.float32)
+
+def _iniciar_proceso_analisis() -> None:
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    mixer.init()
+
+class BibliotecaCaracteristicas:
+    def __init__(self, directorio: Optional[str] = None):
+        if directorio is None:
+            directorio = os.path.join(tempfile.gettempdir(), "modern_player_caracteristicas")
+        os.makedirs(directorio, exist_ok=True)
+        # float32 sin cabecera para poder crecer añadiendo filas al final del archivo
+        self.ruta_matriz = os.path.join(directorio, "caracteristicas.f32")
+        self.ruta_canciones = os.path.join(directorio, "canciones.json")
+        # Una fila de la matriz por canción: [titulo, artista, duracion, ruta, genero, mtime];
+        # filas con NaN no se pudieron analizar y se reintentan en la próxima actualización
+        self.canciones: List[list] = []
+        self.matriz = None
+        self._filas: Dict[str, int] = {}
+        self._indice = None
+        self._validas = None
+        self._bloqueo = threading.Lock()
+        
+        if os.path.exists(self.ruta_matriz) and os.path.exists(self.ruta_canciones):
+            with open(self.ruta_canciones, "r", encoding="utf-8") as f:
+                self.canciones = json.load(f)
+            # Si se cortó a mitad de una actualización, las filas sobrantes de la matriz se ignoran
+            filas = os.path.getsize(self.ruta_matriz) // (4 * DIMENSION_CARACTERISTICAS)
+            del self.canciones[filas:]
+            self._abrir_matriz()
+            self._filas = {fila[3]: i for i, fila in enumerate(self.canciones)}
+            self._construir_indice()
+    
+    def actualizar(self, canciones: Iterable[Cancion], procesos: Optional[int] = None) -> int:
+        pendientes: Dict[str, tuple] = {}
+        cambios = False
+        for cancion in canciones:
+            try:
+                mtime = os.path.getmtime(cancion.ruta_archivo)
+            except OSError:
+                mtime = None
+            datos = [cancion.titulo, cancion.artista, cancion.duracion, cancion.ruta_archivo,
+                     cancion.genero, mtime]
+            fila = self._filas.get(cancion.ruta_archivo)
+            # Un archivo que no se pudo analizar solo se reintenta si cambia en disco
+            if fila is not None and self.canciones[fila][5:] == [mtime]:
+                if self.canciones[fila] != datos:
+                    self.canciones[fila] = datos
+                    cambios = True
+            else:
+                pendientes[cancion.ruta_archivo] = (fila, datos)
+        
+        if pendientes:
+            # "spawn" evita heredar los hilos de Tk, del mezclador y del servidor de control
+            with concurrent.futures.ProcessPoolExecutor(max_workers=procesos,
+                                                        mp_context=multiprocessing.get_context("spawn"),
+                                                        initializer=_iniciar_proceso_analisis) as pool:
+                vectores = list(pool.map(calcular_caracteristicas, list(pendientes), chunksize=8))
+        
+        with self._bloqueo:
+            if pendientes:
+                # Las filas ya conocidas se sobrescriben en su sitio y las nuevas se añaden al final
+                with open(self.ruta_matriz, "r+b" if os.path.exists(self.ruta_matriz) else "w+b") as f:
+                    f.truncate(len(self.canciones) * 4 * DIMENSION_CARACTERISTICAS)
+                    for (fila, datos), vector in zip(pendientes.values(), vectores):
+                        if vector is None:
+                            vector = np.full(DIMENSION_CARACTERISTICAS, np.nan, dtype=np.float32)
+                        if fila is None:
+                            fila = len(self.canciones)
+                            self._filas[datos[3]] = fila
+                            self.canciones.append(datos)
+                        else:
+                            self.canciones[fila] = datos
+                        f.seek(fila * 4 * DIMENSION_CARACTERISTICAS)
+                        f.write(vector.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._abrir_matriz()
+                self._construir_indice()
+            
+            if pendientes or cambios:
+                temporal = self.ruta_canciones + ".tmp"
+                with open(temporal, "w", encoding="utf-8") as f:
+                    json.dump(self.canciones, f, ensure_ascii=False, separators=(",", ":"))
+                os.replace(temporal, self.ruta_canciones)
+        return len(pendientes)
+    
+    def similares(self, ruta: str, cantidad: int = TAMANO_RADIO,
+                  rutas: Optional[set] = None) -> List[Cancion]:
+        # rutas: canciones que siguen en alguna lista; las demás no se proponen
+        with self._bloqueo:
+            fila = self._filas.get(ruta)
+            if fila is None or self._indice is None or not self._validas[fila]:
+                return []
+            
+            # Similitud coseno contra toda la biblioteca en un solo producto matriz-vector
+            puntajes = self._indice @ self._indice[fila]
+            puntajes[~self._validas] = -np.inf
+            puntajes[fila] = -np.inf
+            if rutas is not None:
+                presentes = np.fromiter((datos[3] in rutas for datos in self.canciones), dtype=bool,
+                                        count=len(self.canciones))
+                puntajes[~presentes] = -np.inf
+            cantidad = min(cantidad, int(np.isfinite(puntajes).sum()))
+            if cantidad <= 0:
+                return []
+            
+            candidatos = np.argpartition(-puntajes, cantidad - 1)[:cantidad]
+            candidatos = candidatos[np.argsort(-puntajes[candidatos])]
+            return [Cancion(*self.canciones[i][:5]) for i in candidatos]
+    
+    def crear_radio(self, semilla: Cancion, cantidad: int = TAMANO_RADIO,
+                    rutas: Optional[set] = None) -> ListaReproduccion:
+        radio = ListaReproduccion()
+        radio.agregar_cancion(Cancion(semilla.titulo, semilla.artista, semilla.duracion,
+                                      semilla.ruta_archivo, semilla.genero))
+        for cancion in self.similares(semilla.ruta_archivo, cantidad, rutas):
+            radio.agregar_cancion(cancion)
+        radio.modo_repeticion = "Toda la lista"
+        return radio
+    
+    def _abrir_matriz(self) -> None:
+        self.matriz = None
+        if self.canciones:
+            self.matriz = np.memmap(self.ruta_matriz, dtype=np.float32, mode="r",
+                                    shape=(len(self.canciones), DIMENSION_CARACTERISTICAS))
+    
+    def _construir_indice(self) -> None:
+        if self.matriz is None:
+            self._indice, self._validas = None, np.zeros(0, dtype=bool)
+            return
+        datos = np.asarray(self.matriz, dtype=np.float32)
+        validas = ~np.isnan(datos).any(axis=1)
+        if not validas.any():
+            self._indice, self._validas = None, validas
+            return
+        
+        media = datos[validas].mean(axis=0)
+        desviacion = datos[validas].std(axis=0) + 1e-6
+        indice = (datos - media) / desviacion * np.asarray(PESOS_CARACTERISTICAS, dtype=np.float32)
+        indice[~validas] = 0
+        indice /= np.maximum(np.linalg.norm(indice, axis=1, keepdims=True), 1e-9)
+        self._indice, self._validas = indice.astype(np.float32), validas
+
+# Servidor local (socket Unix) que recibe comandos JSON, uno por línea. El bucle
+# asyncio corre en su propio hilo; los comandos se encolan, se llama a despertar()
+# para avisar al hilo de Tk y este los ejecuta con procesar_comandos().
+class ServidorControl:
+    def __init__(self, ejecutar, ruta_socket: str = RUTA_SOCKET_CONTROL,
+                 despertar: Optional[Callable[[], None]] = None):
+        self.ejecutar = ejecutar  # ejecutar(comando, args) -> dict, en el hilo de Tk
+        self.ruta_socket = ruta_socket
+        self.despertar = despertar  # se llama desde un hilo ajeno a Tk
+        self._comandos: "queue.Queue[tuple]" = queue.Queue()
+        self._aviso_pendiente = False
+        self._suscriptores: set = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self._error_inicio: Optional[BaseException] = None
+    
+    @property
+    def hay_suscriptores(self) -> bool:
+        return bool(self._suscriptores)
+    
+    def iniciar(self) -> None:
+        if os.path.exists(self.ruta_socket):
+            # Solo se reemplaza un socket abandonado, nunca el de otro reproductor en marcha
+            prueba = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                prueba.connect(self.ruta_socket)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.remove(self.ruta_socket)
+            else:
+                raise RuntimeError(f"Ya hay un reproductor escuchando en {self.ruta_socket}")
+            finally:
+                prueba.close()
+        
+        self._loop = asyncio.new_event_loop()
+        self._error_inicio = None
+        listo = threading.Event()
+        threading.Thread(target=self._correr, args=(listo,), daemon=True).start()
+        listo.wait()
+        if self._error_inicio is not None:
+            self._loop = None
+            raise self._error_inicio
+    
+    def detener(self) -> None:
+        if self._loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._cerrar(), self._loop).result(timeout=2)
+        except (concurrent.futures.TimeoutError, RuntimeError):
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+        if os.path.exists(self.ruta_socket):
+            os.remove(self.ruta_socket)
+    
+    def procesar_comandos(self) -> bool:
+        # Devuelve True si quedaron comandos para otra vuelta del bucle de Tk
+        self._aviso_pendiente = False
+        for _ in range(MAX_COMANDOS_POR_CICLO):
+            try:
+                comando, args, futuro = self._comandos.get_nowait()
+            except queue.Empty:
+                return False
+            
+            try:
+                futuro.set_result({"ok": True, "resultado": self.ejecutar(comando, args)})
+            except Exception as e:
+                futuro.set_result({"ok": False, "error": str(e)})
+        return not self._comandos.empty()
+    
+    def notificar(self, evento: dict) -> None:
+        if self._loop is not None and self._suscriptores:
+            linea = (json.dumps(evento, ensure_ascii=False) + "\n").encode("utf-8")
+            self._loop.call_soon_threadsafe(self._difundir, linea)
+    
+    def _correr(self, listo: threading.Event) -> None:
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        try:
+            self._servidor = loop.run_until_complete(asyncio.start_unix_server(self._atender, path=self.ruta_socket))
+            os.chmod(self.ruta_socket, 0o600)
+        except BaseException as e:
+            self._error_inicio = e
+            loop.close()
+            return
+        finally:
+            listo.set()
+        loop.run_forever()
+        loop.close()
+    
+    async def _cerrar(self) -> None:
+        self._servidor.close()
+        tareas = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for tarea in tareas:
+            tarea.cancel()
+        await asyncio.gather(*tareas, return_exceptions=True)
+    
+    def _encolar(self, comando: str, args: dict, futuro: concurrent.futures.Future) -> None:
+        self._comandos.put((comando, args, futuro))
+        if not self._aviso_pendiente and self.despertar is not None:
+            self._aviso_pendiente = True
+            # despertar() puede bloquear hasta que Tk atienda la llamada; no se hace en el bucle
+            self._loop.run_in_executor(None, self._avisar)
+    
+    def _avisar(self) -> None:
+        try:
+            self.despertar()
+        except Exception:
+            self._aviso_pendiente = False  # Tk todavía no escucha; lo intentará el próximo comando
+    
+    def _difundir(self, linea: bytes) -> None:
+        for writer in list(self._suscriptores):
+            if writer.is_closing():
+                self._suscriptores.discard(writer)
+            elif writer.transport.get_write_buffer_size() > MAX_BUFFER_SUSCRIPTOR:
+                # No lee sus notificaciones; se le desconecta en vez de acumularlas sin límite
+                self._suscriptores.discard(writer)
+                writer.close()
+            else:
+                writer.write(linea)
+    
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # Las peticiones se leen sin esperar respuesta (pipelining); las
+        # respuestas salen en el mismo orden en que llegaron
+        pendientes: "asyncio.Queue[Optional[tuple]]" = asyncio.Queue()
+        respondedor = asyncio.ensure_future(self._responder(pendientes, writer))
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                
+                try:
+                    mensaje = json.loads(linea)
+                    id_mensaje = mensaje.get("id")
+                    comando = mensaje["cmd"]
+                    args = mensaje.get("args") or {}
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    await pendientes.put((None, {"ok": False, "error": "Mensaje inválido"}))
+                    continue
+                
+                if comando == "subscribe":
+                    self._suscriptores.add(writer)
+                    await pendientes.put((id_mensaje, {"ok": True, "resultado": None}))
+                    continue
+                
+                futuro = concurrent.futures.Future()
+                self._encolar(comando, args, futuro)
+                await pendientes.put((id_mensaje, futuro))
+        except ConnectionError:
+            pass
+        finally:
+            await pendientes.put(None)
+            await respondedor
+            self._suscriptores.discard(writer)
+            writer.close()
+    
+    async def _responder(self, pendientes: "asyncio.Queue[Optional[tuple]]", writer: asyncio.StreamWriter) -> None:
+        while True:
+            elemento = await pendientes.get()
+            if elemento is None:
+                break
+            
+            id_mensaje, respuesta = elemento
+            if isinstance(respuesta, concurrent.futures.Future):
+                respuesta = await asyncio.wrap_future(respuesta)
+            respuesta = dict(respuesta, id=id_mensaje)
+            if writer.is_closing():
+                continue
+            writer.write((json.dumps(respuesta, ensure_ascii=False) + "\n").encode("utf-8"))
+            
+            # Se agrupan las escrituras mientras haya respuestas listas
+            if pendientes.empty():
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    pass
+
+def medir_rendimiento_control(ruta_socket: str = RUTA_SOCKET_CONTROL, total: int = 10000) -> None:
+    cliente = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    cliente.connect(ruta_socket)
+    archivo = cliente.makefile("rb")
+    
+    # Latencia de ida y vuelta, una petición a la vez
+    muestras = min(total, 200)
+    inicio = time.perf_counter()
+    for i in range(muestras):
+        cliente.sendall(json.dumps({"id": i, "cmd": "state"}).encode("utf-8") + b"\n")
+        archivo.readline()
+    latencia = (time.perf_counter() - inicio) / muestras
+    
+    # Rendimiento con peticiones encadenadas sin esperar respuesta
+    peticiones = b"".join(json.dumps({"id": i, "cmd": "state"}).encode("utf-8") + b"\n" for i in range(total))
+    inicio = time.perf_counter()
+    emisor = threading.Thread(target=cliente.sendall, args=(peticiones,))
+    emisor.start()
+    for _ in range(total):
+        archivo.readline()
+    duracion = time.perf_counter() - inicio
+    emisor.join()
+    cliente.close()
+    
+    print(f"Latencia media: {latencia * 1000:.3f} ms")
+    print(f"Rendimiento: {total / duracion:.0f} comandos/s ({total} comandos en {duracion:.3f} s)")
 
 class ModernButton(tk.Button):
     def __init__(self, master=None, **kwargs):
@@ -284,9 +1501,26 @@ class SecondaryButton(tk.Button):
         self.config(bg=COLOR_SECUNDARIO)
 
 class ReproductorApp:
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, presupuesto_memoria: int = PRESUPUESTO_MEMORIA_LISTAS):
         self.root = root
-        self.gestor = GestorListas()
+        self.gestor = GestorListas(presupuesto_memoria, diario=DiarioCambios())
+        self.portadas = CachePortadas()
+        self.mostrar_miniaturas = MOSTRAR_MINIATURAS_LISTA
+        self.portada_mostrada: Optional[str] = None
+        self.filas_canciones: List[str] = []  # ítems del Treeview, solo los visibles
+        self.rutas_filas: Dict[str, str] = {}
+        self.inicio_ventana = 0
+        self.indice_seleccionado: Optional[int] = None
+        self.lista_mostrada: Optional[ListaReproduccion] = None
+        self.generacion_mostrada = -1
+        self.control: Optional[ServidorControl] = None
+        self.caracteristicas: Optional[BibliotecaCaracteristicas] = None
+        self.radios_listas: "queue.Queue[tuple]" = queue.Queue()
+        self.analizando_radio = False
+        self.rutas_biblioteca: set = set()
+        self.ultimo_estado: Optional[dict] = None
+        self.error_diario_mostrado = False
+        self.error_compactacion_mostrado = False
         self.setup_ui()
         self.setup_bindings()
         self.tiempo_inicio_reproduccion = 0
@@ -348,6 +1582,10 @@ class ReproductorApp:
         ModernButton(toolbar_frame, text="+ Agregar Canción", command=self.agregar_cancion).pack(side=tk.LEFT, padx=5)
         SecondaryButton(toolbar_frame, text="- Eliminar Canción", command=self.eliminar_cancion).pack(side=tk.LEFT, padx=5)
         SecondaryButton(toolbar_frame, text="✏ Editar", command=self.editar_cancion).pack(side=tk.LEFT, padx=5)
+        SecondaryButton(toolbar_frame, text="📻 Radio", command=self.crear_radio).pack(side=tk.LEFT, padx=5)
+        self.btn_miniaturas = SecondaryButton(toolbar_frame, command=self.alternar_miniaturas,
+                                              text="🖼 Ocultar portadas" if self.mostrar_miniaturas else "🖼 Ver portadas")
+        self.btn_miniaturas.pack(side=tk.LEFT, padx=5)
     
     def setup_treeview(self, parent):
         # Frame para el treeview y scrollbar
@@ -363,7 +1601,7 @@ class ReproductorApp:
             background=COLOR_SECUNDARIO,
             foreground=COLOR_TEXTO,
             fieldbackground=COLOR_SECUNDARIO,
-            rowheight=30,
+            rowheight=ALTO_FILA_LISTA,
             font=("Arial", 10)
         )
         style.configure("Treeview.Heading",
@@ -378,7 +1616,8 @@ class ReproductorApp:
         )
 
         self.tree = ttk.Treeview(tree_frame, columns=("titulo", "artista", "duracion", "genero"), 
-                                show="headings", selectmode="browse")
+                                show="tree headings" if self.mostrar_miniaturas else "headings",
+                                selectmode="browse")
 
         self.tree.heading("titulo", text="Título")
         self.tree.heading("artista", text="Artista")
@@ -389,12 +1628,20 @@ class ReproductorApp:
         self.tree.column("artista", width=200, anchor="w")
         self.tree.column("duracion", width=100, anchor="center")
         self.tree.column("genero", width=150, anchor="w")
+        self.tree.column("#0", width=40, stretch=False)
 
-        scroll = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scroll.set)
+        # La barra y la rueda desplazan la ventana de filas mostrada, no el Treeview
+        self.scroll_tree = ttk.Scrollbar(tree_frame, orient="vertical", command=self.desplazar_lista)
+        self.tree.bind("<Configure>", lambda e: self.mostrar_ventana())
+        self.tree.bind("<MouseWheel>", lambda e: self.desplazar_lista("scroll", -3 if e.delta > 0 else 3, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.desplazar_lista("scroll", -3, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.desplazar_lista("scroll", 3, "units"))
+        self.tree.bind("<Up>", lambda e: self.mover_seleccion(-1))
+        self.tree.bind("<Down>", lambda e: self.mover_seleccion(1))
+        self.tree.bind("<<TreeviewSelect>>", self.on_seleccion_tree)
         
         self.tree.grid(row=0, column=0, sticky="nsew")
-        scroll.grid(row=0, column=1, sticky="ns")
+        self.scroll_tree.grid(row=0, column=1, sticky="ns")
     
     def setup_barra_reproduccion(self):
         # Frame para la barra de reproducción
@@ -450,9 +1697,15 @@ class ReproductorApp:
         self.current_song_title = tk.StringVar(value="No hay canción seleccionada")
         self.current_song_artist = tk.StringVar(value="")
 
-        tk.Label(self.current_song_frame, textvariable=self.current_song_title, 
+        self.portada_label = tk.Label(self.current_song_frame, bg=COLOR_SECUNDARIO)
+        self.portada_label.pack(side=tk.LEFT, padx=(0, 10))
+
+        info_frame = tk.Frame(self.current_song_frame, bg=COLOR_SECUNDARIO)
+        info_frame.pack(side=tk.LEFT, fill=tk.X)
+
+        tk.Label(info_frame, textvariable=self.current_song_title, 
                 bg=COLOR_SECUNDARIO, fg=COLOR_TEXTO, font=("Arial", 12, "bold")).pack(anchor="w")
-        tk.Label(self.current_song_frame, textvariable=self.current_song_artist, 
+        tk.Label(info_frame, textvariable=self.current_song_artist, 
                 bg=COLOR_SECUNDARIO, fg=COLOR_TEXTO_SECUNDARIO, font=("Arial", 10)).pack(anchor="w")
     
     def setup_bindings(self):
@@ -461,11 +1714,133 @@ class ReproductorApp:
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
     
     def on_close(self):
+        if self.control:
+            self.control.detener()
         if self.gestor.lista_activa:
             self.gestor.lista_activa.detener()
+        try:
+            self.gestor.cerrar()
+        except RuntimeError as e:
+            if not self.error_diario_mostrado:
+                messagebox.showerror("Error", f"Los últimos cambios en las listas no se guardaron: {e}")
         mixer.quit()
         self.root.destroy()
     
+    def iniciar_control(self):
+        if not hasattr(asyncio, "start_unix_server"):  # Sin sockets Unix (Windows)
+            return
+        
+        # Con Tcl multihilo, otro hilo puede generar un evento virtual y despertar a Tk
+        # en cuanto llega un comando; si no, se revisa la cola periódicamente
+        try:
+            multihilo = bool(int(self.root.tk.eval("set tcl_platform(threaded)")))
+        except (tk.TclError, ValueError):
+            multihilo = False
+        despertar = None
+        if multihilo:
+            self.root.bind("<<ComandoRemoto>>", lambda e: self.procesar_control())
+            despertar = lambda: self.root.event_generate("<<ComandoRemoto>>", when="tail")
+        
+        control = ServidorControl(self.ejecutar_comando, despertar=despertar)
+        try:
+            os.makedirs(DIRECTORIO_CONTROL, mode=0o700, exist_ok=True)
+            control.iniciar()
+        except Exception as e:
+            messagebox.showwarning("Advertencia", f"No se pudo iniciar el control remoto: {e}")
+            return
+        self.control = control
+        if multihilo:
+            self.root.after_idle(self.procesar_control)
+        else:
+            self.revisar_control()
+    
+    def procesar_control(self):
+        if self.control.procesar_comandos():
+            self.root.after_idle(self.procesar_control)
+    
+    def revisar_control(self):
+        self.procesar_control()
+        self.root.after(INTERVALO_COMANDOS_MS, self.revisar_control)
+    
+    def notificar_estado(self):
+        if self.control is None or not self.control.hay_suscriptores:
+            return
+        estado = self.obtener_estado()
+        if estado != self.ultimo_estado:
+            self.ultimo_estado = estado
+            self.control.notificar({"evento": "estado", "estado": estado})
+    
+    def obtener_estado(self) -> dict:
+        lista = self.gestor.lista_activa
+        cancion = lista.actual.cancion if lista and lista.actual else None
+        return {
+            "lista": self.combo_listas.get() if lista else None,
+            "cancion": cancion.titulo if cancion else None,
+            "artista": cancion.artista if cancion else None,
+            "reproduciendo": bool(lista and lista.esta_reproduciendo),
+            "repeticion": lista.modo_repeticion if lista else None,
+            "canciones": len(lista) if lista else 0
+        }
+    
+    def ejecutar_comando(self, comando: str, args: dict) -> dict:
+        if comando == "playlists":
+            return {"listas": self.gestor.obtener_listas()}
+        if comando == "switch":
+            nombre = args["nombre"]
+            if nombre not in self.gestor.listas:
+                raise ValueError(f"No existe la lista '{nombre}'")
+            self.combo_listas.set(nombre)
+            self.cambiar_lista_activa()
+            return self.obtener_estado()
+        if comando == "state":
+            return self.obtener_estado()
+        if comando == "memory":
+            # Con "presupuesto" (bytes) se ajusta el límite en caliente y se aplica enseguida
+            if "presupuesto" in args:
+                presupuesto = int(args["presupuesto"])
+                if presupuesto < 0:
+                    raise ValueError("El presupuesto no puede ser negativo")
+                self.gestor.presupuesto_memoria = presupuesto
+                self.gestor.aplicar_presupuesto()
+            return self.gestor.obtener_estadisticas_memoria()
+        
+        lista = self.gestor.lista_activa
+        if not lista:
+            raise ValueError("No hay lista activa")
+        
+        if comando == "play":
+            if not lista.esta_reproduciendo:
+                self.reproducir_pausar()
+        elif comando == "pause":
+            if lista.esta_reproduciendo:
+                self.reproducir_pausar()
+        elif comando == "next":
+            self.siguiente_cancion()
+        elif comando == "previous":
+            self.cancion_anterior()
+        elif comando == "seek":
+            if lista.actual is None:
+                raise ValueError("No hay canción seleccionada")
+            self.saltar_a_segundos(float(args["segundos"]))
+        elif comando == "add":
+            ruta = args["ruta"]
+            titulo = args.get("titulo") or os.path.basename(ruta).split('.')[0]
+            lista.agregar_cancion(Cancion(titulo, args.get("artista", "Desconocido"),
+                                          float(args.get("duracion", 0.0)), ruta,
+                                          args.get("genero", "No especificado")))
+            self.gestor.aplicar_presupuesto()
+            self.actualizar_canciones()
+            self.actualizar_info_lista()
+        elif comando == "remove":
+            if not lista.eliminar_cancion(args["titulo"]):
+                raise ValueError(f"No existe la canción '{args['titulo']}'")
+            self.actualizar_canciones()
+            self.actualizar_info_lista()
+        else:
+            raise ValueError(f"Comando desconocido: {comando}")
+        
+        return self.obtener_estado()
+    
     def cambiar_lista_activa(self, event=None):
         lista_seleccionada = self.combo_listas.get()
         if lista_seleccionada:
@@ -479,22 +1854,140 @@ class ReproductorApp:
         if listas:
             self.combo_listas.current(0)
             self.cambiar_lista_activa()
+        self.notificar_estado()
     
     def actualizar_canciones(self):
-        self.tree.delete(*self.tree.get_children())
-        if self.gestor.lista_activa:
-            for cancion in self.gestor.lista_activa.listar_canciones():
-                self.tree.insert("", "end", values=(
-                    cancion.titulo, 
-                    cancion.artista, 
-                    cancion.obtener_duracion_formateada(),
-                    cancion.genero
-                ))
+        lista = self.gestor.lista_activa
+        if lista is self.lista_mostrada and lista is not None and lista.generacion == self.generacion_mostrada:
+            return
+        
+        if lista is not self.lista_mostrada:
+            self.inicio_ventana = 0
+            self.indice_seleccionado = None
+        self.lista_mostrada = lista
+        self.generacion_mostrada = lista.generacion if lista else -1
+        self.mostrar_ventana()
+    
+    def filas_por_pantalla(self) -> int:
+        # Se descuenta una fila para el encabezado
+        return max(1, self.tree.winfo_height() // ALTO_FILA_LISTA - 1)
+    
+    def mostrar_ventana(self):
+        # El Treeview solo tiene las filas que caben en pantalla; al desplazarse se
+        # reutilizan con otra porción de las filas de la lista, sin recorrer nodos
+        lista = self.lista_mostrada
+        total = len(lista) if lista else 0
+        visibles = self.filas_por_pantalla()
+        self.inicio_ventana = max(0, min(self.inicio_ventana, total - visibles))
+        if self.indice_seleccionado is not None and self.indice_seleccionado >= total:
+            self.indice_seleccionado = None
+        filas = lista.obtener_filas(self.inicio_ventana, visibles) if lista else []
+        
+        while len(self.filas_canciones) > len(filas):
+            item = self.filas_canciones.pop()
+            self.rutas_filas.pop(item, None)
+            self.tree.delete(item)
+        while len(self.filas_canciones) < len(filas):
+            self.filas_canciones.append(self.tree.insert("", "end"))
+        for item, fila in zip(self.filas_canciones, filas):
+            cancion = Cancion(*fila)
+            self.rutas_filas[item] = cancion.ruta_archivo
+            self.tree.item(item, image="", values=(
+                cancion.titulo,
+                cancion.artista,
+                cancion.obtener_duracion_formateada(),
+                cancion.genero
+            ))
+        
+        posicion = None if self.indice_seleccionado is None else self.indice_seleccionado - self.inicio_ventana
+        if posicion is not None and 0 <= posicion < len(filas):
+            self.tree.selection_set(self.filas_canciones[posicion])
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+        
+        if total > len(filas):
+            self.scroll_tree.set(self.inicio_ventana / total, (self.inicio_ventana + len(filas)) / total)
+        else:
+            self.scroll_tree.set(0, 1)
+        if self.mostrar_miniaturas:
+            self.solicitar_miniaturas_visibles()
+    
+    def desplazar_lista(self, accion, cantidad, unidad=None):
+        total = len(self.lista_mostrada) if self.lista_mostrada else 0
+        if accion == "moveto":
+            self.inicio_ventana = int(float(cantidad) * total)
+        else:
+            paso = self.filas_por_pantalla() if unidad == "pages" else 1
+            self.inicio_ventana += int(cantidad) * paso
+        self.mostrar_ventana()
+        return "break"
+    
+    def mover_seleccion(self, paso: int):
+        total = len(self.lista_mostrada) if self.lista_mostrada else 0
+        if total == 0:
+            return "break"
+        
+        indice = 0 if self.indice_seleccionado is None else self.indice_seleccionado + paso
+        indice = max(0, min(total - 1, indice))
+        self.indice_seleccionado = indice
+        visibles = self.filas_por_pantalla()
+        if indice < self.inicio_ventana:
+            self.inicio_ventana = indice
+        elif indice >= self.inicio_ventana + visibles:
+            self.inicio_ventana = indice - visibles + 1
+        self.mostrar_ventana()
+        return "break"
+    
+    def on_seleccion_tree(self, event):
+        seleccion = self.tree.selection()
+        if seleccion and seleccion[0] in self.rutas_filas:
+            self.indice_seleccionado = self.inicio_ventana + self.filas_canciones.index(seleccion[0])
+    
+    def alternar_miniaturas(self):
+        self.mostrar_miniaturas = not self.mostrar_miniaturas
+        self.tree.configure(show="tree headings" if self.mostrar_miniaturas else "headings")
+        self.btn_miniaturas.config(text="🖼 Ocultar portadas" if self.mostrar_miniaturas else "🖼 Ver portadas")
+        self.mostrar_ventana()
+    
+    def solicitar_miniaturas_visibles(self):
+        # Solo se piden las filas visibles; la decodificación ocurre en el hilo de portadas.
+        # Cada desplazamiento abre una vista nueva y lo pedido por las anteriores se descarta
+        vista = self.portadas.nueva_vista()
+        for item in self.filas_canciones:
+            ruta = self.rutas_filas[item]
+            self.portadas.solicitar(ruta, TAMANO_MINIATURA,
+                                    lambda foto, item=item, ruta=ruta: self.poner_miniatura(item, ruta, foto), vista)
+    
+    def poner_miniatura(self, item: str, ruta: str, foto):
+        # El ítem pudo pasar a mostrar otra canción mientras se cargaba la miniatura
+        if foto is not None and self.rutas_filas.get(item) == ruta:
+            self.tree.item(item, image=foto)
+    
+    def poner_portada(self, ruta: str, foto):
+        if ruta == self.portada_mostrada:
+            self.portada_label.config(image=foto if foto is not None else "")
+            self.portada_label.image = foto
+    
+    def actualizar_portadas(self):
+        self.portadas.procesar_resultados()
+        
+        ruta = None
+        if self.gestor.lista_activa and self.gestor.lista_activa.actual:
+            ruta = self.gestor.lista_activa.actual.cancion.ruta_archivo
+        
+        if ruta != self.portada_mostrada:
+            self.portada_mostrada = ruta
+            if ruta is None:
+                self.poner_portada(None, None)
+            else:
+                self.portadas.solicitar(ruta, TAMANO_PORTADA, lambda foto, ruta=ruta: self.poner_portada(ruta, foto))
+        
+        self.root.after(100, self.actualizar_portadas)
     
     def actualizar_info_lista(self):
         if self.gestor.lista_activa:
             duracion_total = self.gestor.lista_activa.obtener_duracion_total()
-            num_canciones = len(self.gestor.lista_activa.listar_canciones())
+            num_canciones = len(self.gestor.lista_activa)
             
             if self.gestor.lista_activa.actual:
                 cancion = self.gestor.lista_activa.actual.cancion
@@ -509,6 +2002,7 @@ class ReproductorApp:
             self.current_song_title.set("No hay lista activa")
             self.current_song_artist.set("")
             self.tiempo_total.set("0:00")
+        self.notificar_estado()
     
     def crear_lista(self):
         nombre = simpledialog.askstring("Nueva Lista", "Nombre de la lista:")
@@ -518,6 +2012,59 @@ class ReproductorApp:
             else:
                 messagebox.showerror("Error", "Ya existe una lista con ese nombre")
     
+    def crear_radio(self):
+        if np is None:
+            messagebox.showerror("Error", "La radio necesita NumPy instalado")
+            return
+        if not self.gestor.lista_activa or not self.gestor.lista_activa.actual:
+            messagebox.showwarning("Advertencia", "Selecciona una canción primero")
+            return
+        if self.analizando_radio:
+            return
+        
+        self.analizando_radio = True
+        semilla = self.gestor.lista_activa.actual.cancion
+        canciones = list(self.gestor.canciones_biblioteca())
+        self.rutas_biblioteca = {cancion.ruta_archivo for cancion in canciones}
+        threading.Thread(target=self.preparar_radio, args=(semilla, canciones), daemon=True).start()
+        self.verificar_radio()
+    
+    def preparar_radio(self, semilla: Cancion, canciones: List[Cancion]):
+        # Hilo secundario: el análisis reparte las canciones nuevas en varios procesos
+        try:
+            if self.caracteristicas is None:
+                self.caracteristicas = BibliotecaCaracteristicas()
+            self.caracteristicas.actualizar(canciones)
+            self.radios_listas.put((semilla, None))
+        except Exception as e:
+            self.radios_listas.put((semilla, e))
+    
+    def verificar_radio(self):
+        try:
+            semilla, error = self.radios_listas.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self.verificar_radio)
+            return
+        
+        self.analizando_radio = False
+        if error is not None:
+            messagebox.showerror("Error", f"No se pudo analizar la biblioteca: {error}")
+            return
+        
+        radio = self.caracteristicas.crear_radio(semilla, rutas=self.rutas_biblioteca)
+        if len(radio) < 2:
+            messagebox.showinfo("Radio", "No se encontraron canciones similares")
+            return
+        
+        nombre = f"Radio: {semilla.titulo}"
+        self.gestor.eliminar_lista(nombre)
+        self.gestor.agregar_lista(nombre, radio)
+        self.combo_listas["values"] = self.gestor.obtener_listas()
+        self.combo_listas.set(nombre)
+        self.cambiar_lista_activa()
+        self.btn_repetir.config(text=f"Repetir: {radio.modo_repeticion}")
+        self.reproducir_pausar()
+    
     def eliminar_lista(self):
         lista = self.combo_listas.get()
         if lista and messagebox.askyesno("Confirmar", f"¿Eliminar lista '{lista}'?"):
@@ -540,6 +2087,7 @@ class ReproductorApp:
                 cancion = Cancion(titulo, "Desconocido", 0.0, archivo, "No especificado")
                 self.gestor.lista_activa.agregar_cancion(cancion)
             
+            self.gestor.aplicar_presupuesto()
             self.actualizar_canciones()
             self.actualizar_info_lista()
     
@@ -619,7 +2167,8 @@ class ReproductorApp:
                 messagebox.showerror("Error", "El título no puede estar vacío")
                 return
             
-            cancion.editar(titulo, artista, nueva_duracion, genero)
+            if not self.gestor.lista_activa.editar_cancion(cancion, titulo, artista, nueva_duracion, genero):
+                messagebox.showerror("Error", "La canción ya no está en la lista")
             self.actualizar_canciones()
             self.actualizar_info_lista()
             ventana.destroy()
@@ -659,6 +2208,7 @@ class ReproductorApp:
                 self.current_song_title.set(cancion.titulo)
                 self.current_song_artist.set(cancion.artista)
                 self.tiempo_total.set(cancion.obtener_duracion_formateada())
+        self.notificar_estado()
     
     def siguiente_cancion(self):
         if self.gestor.lista_activa:
@@ -671,6 +2221,7 @@ class ReproductorApp:
                 self.current_song_title.set(cancion.titulo)
                 self.current_song_artist.set(cancion.artista)
                 self.tiempo_total.set(cancion.obtener_duracion_formateada())
+            self.notificar_estado()
     
     def cancion_anterior(self):
         if self.gestor.lista_activa:
@@ -683,6 +2234,7 @@ class ReproductorApp:
                 self.current_song_title.set(cancion.titulo)
                 self.current_song_artist.set(cancion.artista)
                 self.tiempo_total.set(cancion.obtener_duracion_formateada())
+            self.notificar_estado()
     
     def seleccionar_cancion(self, event):
         if not self.gestor.lista_activa:
@@ -693,21 +2245,21 @@ class ReproductorApp:
             valores = self.tree.item(seleccion[0])["values"]
             if valores:
                 titulo = valores[0]
-                canciones = self.gestor.lista_activa.listar_canciones()
-                for cancion in canciones:
-                    if cancion.titulo == titulo:
-                        self.gestor.lista_activa.seleccionar_cancion(cancion)
-                        self.btn_play.config(text="⏸")
-                        self.current_song_title.set(cancion.titulo)
-                        self.current_song_artist.set(cancion.artista)
-                        self.tiempo_total.set(cancion.obtener_duracion_formateada())
-                        self.tiempo_inicio_reproduccion = time.time()
-                        break
+                cancion = self.gestor.lista_activa.buscar_cancion(str(titulo))
+                if cancion:
+                    self.gestor.lista_activa.seleccionar_cancion(cancion)
+                    self.btn_play.config(text="⏸")
+                    self.current_song_title.set(cancion.titulo)
+                    self.current_song_artist.set(cancion.artista)
+                    self.tiempo_total.set(cancion.obtener_duracion_formateada())
+                    self.tiempo_inicio_reproduccion = time.time()
+                    self.notificar_estado()
     
     def cambiar_repeticion(self):
         if self.gestor.lista_activa:
             modo = self.gestor.lista_activa.cambiar_modo_repeticion()
             self.btn_repetir.config(text=f"Repetir: {modo}")
+            self.notificar_estado()
     
     def ajustar_volumen(self, valor):
         if self.gestor.lista_activa:
@@ -721,9 +2273,11 @@ class ReproductorApp:
             nueva_posicion = self.progress_bar.get()
             duracion_total = self.gestor.lista_activa.actual.cancion.duracion * 60  # Convertir a segundos
             posicion_segundos = (nueva_posicion / 100) * duracion_total
-            
-            mixer.music.set_pos(posicion_segundos)
-            self.tiempo_inicio_reproduccion = time.time() - posicion_segundos
+            self.saltar_a_segundos(posicion_segundos)
+    
+    def saltar_a_segundos(self, posicion_segundos: float):
+        mixer.music.set_pos(posicion_segundos)
+        self.tiempo_inicio_reproduccion = time.time() - posicion_segundos
     
     def actualizar_progreso(self):
         if self.gestor.lista_activa and self.gestor.lista_activa.esta_reproduciendo and self.gestor.lista_activa.actual:
@@ -734,6 +2288,7 @@ class ReproductorApp:
                 self.gestor.lista_activa.manejar_fin_reproduccion()
                 if self.gestor.lista_activa.esta_reproduciendo:
                     self.tiempo_inicio_reproduccion = time.time()
+                self.notificar_estado()
                 return
             
             porcentaje = (tiempo_transcurrido / duracion_total) * 100
@@ -749,6 +2304,15 @@ class ReproductorApp:
         self.root.after(100, self.actualizar_progreso)
     
     def verificar_eventos(self):
+        diario = self.gestor.diario
+        if diario is not None and diario.error is not None and not self.error_diario_mostrado:
+            self.error_diario_mostrado = True
+            messagebox.showerror("Error", f"Los cambios en las listas ya no se están guardando: {diario.error}")
+        if diario is not None and diario.error_compactacion is not None and not self.error_compactacion_mostrado:
+            self.error_compactacion_mostrado = True
+            messagebox.showwarning("Advertencia", "No se pudo compactar el diario de cambios; "
+                                   f"los cambios siguen guardados pero ocupa cada vez más: {diario.error_compactacion}")
+        
         for event in pygame.event.get():
             if event.type == pygame.USEREVENT:
                 if self.gestor.lista_activa:
@@ -762,38 +2326,53 @@ class ReproductorApp:
                         self.tiempo_total.set(cancion.obtener_duracion_formateada())
                     else:
                         self.btn_play.config(text="▶")
+                    self.notificar_estado()
         
         self.root.after(100, self.verificar_eventos)
 
-pygame.init()
-mixer.init()
-
-root = tk.Tk()
-
-style = ttk.Style()
-style.theme_use("clam")
-
-style.configure("TCombobox", 
-    fieldbackground=COLOR_SECUNDARIO, 
-    background=COLOR_SECUNDARIO,
-    foreground=COLOR_TEXTO,
-    selectbackground=COLOR_HOVER,
-    selectforeground=COLOR_TEXTO,
-    font=("Arial", 10)
-)
-
-style.configure("Horizontal.TScale", 
-    background=COLOR_SECUNDARIO,
-    troughcolor=COLOR_HOVER,
-    bordercolor=COLOR_PRIMARIO,
-    lightcolor=COLOR_PRIMARIO,
-    darkcolor=COLOR_PRIMARIO
-)
-
-app = ReproductorApp(root)
-app.actualizar_listas()
-app.verificar_eventos()
-app.actualizar_progreso()
-
-root.mainloop()
-pygame.quit()
\ No newline at end of file
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--medir-control":
+        medir_rendimiento_control(total=int(sys.argv[2]) if len(sys.argv) > 2 else 10000)
+        sys.exit(0)
+    if len(sys.argv) > 1 and sys.argv[1] == "--medir-diario":
+        medir_recuperacion_diario(total=int(sys.argv[2]) if len(sys.argv) > 2 else 1000000)
+        sys.exit(0)
+
+    presupuesto_memoria = PRESUPUESTO_MEMORIA_LISTAS
+    if "--presupuesto-memoria" in sys.argv:  # en MiB
+        presupuesto_memoria = int(float(sys.argv[sys.argv.index("--presupuesto-memoria") + 1]) * 1024 * 1024)
+
+    pygame.init()
+    mixer.init()
+
+    root = tk.Tk()
+
+    style = ttk.Style()
+    style.theme_use("clam")
+
+    style.configure("TCombobox", 
+        fieldbackground=COLOR_SECUNDARIO, 
+        background=COLOR_SECUNDARIO,
+        foreground=COLOR_TEXTO,
+        selectbackground=COLOR_HOVER,
+        selectforeground=COLOR_TEXTO,
+        font=("Arial", 10)
+    )
+
+    style.configure("Horizontal.TScale", 
+        background=COLOR_SECUNDARIO,
+        troughcolor=COLOR_HOVER,
+        bordercolor=COLOR_PRIMARIO,
+        lightcolor=COLOR_PRIMARIO,
+        darkcolor=COLOR_PRIMARIO
+    )
+
+    app = ReproductorApp(root, presupuesto_memoria)
+    app.actualizar_listas()
+    app.verificar_eventos()
+    app.actualizar_progreso()
+    app.actualizar_portadas()
+    app.iniciar_control()
+
+    root.mainloop()
+    pygame.quit()
\ No newline at end of file
@@ -0,0 +1,46 @@
+import os
+import wave
+
+import numpy as np
+
+from SecondProyect import DIMENSION_CARACTERISTICAS, BibliotecaCaracteristicas, Cancion
+
+
+def escribir_tono(ruta, frecuencia, segundos=2, tasa=11025):
+    t = np.arange(int(segundos * tasa)) / tasa
+    muestras = (np.sin(2 * np.pi * frecuencia * t) * 12000).astype("<i2")
+    with wave.open(ruta, "wb") as archivo:
+        archivo.setnchannels(1)
+        archivo.setsampwidth(2)
+        archivo.setframerate(tasa)
+        archivo.writeframes(muestras.tobytes())
+
+
+def test_reintenta_filas_fallidas_y_crece_sin_reescribir(tmp_path):
+    uno, dos = str(tmp_path / "uno.wav"), str(tmp_path / "dos.wav")
+    escribir_tono(uno, 440)
+    canciones = [Cancion("uno", "A", 2.0, uno, "Rock"), Cancion("dos", "B", 2.0, dos, "Pop")]
+
+    biblioteca = BibliotecaCaracteristicas(str(tmp_path / "cache"))
+    assert biblioteca.actualizar(canciones, procesos=1) == 2
+    assert list(biblioteca._validas) == [True, False]
+    # Mientras el archivo no cambie, la fila fallida no se reintenta ni se reescribe nada
+    os.utime(biblioteca.ruta_canciones, (0, 0))
+    assert biblioteca.actualizar(canciones, procesos=1) == 0
+    assert os.path.getmtime(biblioteca.ruta_canciones) == 0
+
+    escribir_tono(dos, 880)
+    assert biblioteca.actualizar(canciones, procesos=1) == 1
+    assert list(biblioteca._validas) == [True, True]
+    assert os.path.getsize(biblioteca.ruta_matriz) == 2 * 4 * DIMENSION_CARACTERISTICAS
+
+    # Sin cambios no se vuelve a analizar nada, tampoco tras reabrir la caché
+    reabierta = BibliotecaCaracteristicas(str(tmp_path / "cache"))
+    assert reabierta.actualizar(canciones, procesos=1) == 0
+    assert [c.titulo for c in reabierta.similares(uno)] == ["dos"]
+    assert reabierta.similares(uno, rutas={uno}) == []  # "dos" ya no está en ninguna lista
+
+    # Una canción modificada se vuelve a analizar en su misma fila
+    os.utime(uno, (0, 0))
+    assert reabierta.actualizar(canciones, procesos=1) == 1
+    assert len(reabierta.canciones) == 2
@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+
+from SecondProyect import CachePortadas
+
+
+def esperar_resultados(cache, cantidad):
+    limite = time.time() + 5
+    while cache._resultados.qsize() < cantidad and time.time() < limite:
+        time.sleep(0.01)
+    cache.procesar_resultados()
+
+
+def test_descarta_filas_que_ya_no_se_ven_y_atiende_primero_lo_ultimo(tmp_path):
+    cache = CachePortadas(directorio_cache=str(tmp_path))
+    liberar = threading.Event()
+    cargadas = []
+
+    def cargar(ruta, tamano):
+        cargadas.append(ruta)
+        liberar.wait(5)
+        return None
+
+    cache._cargar_miniatura = cargar
+    recibidas = []
+    vista = cache.nueva_vista()
+    cache.solicitar("/0.mp3", (24, 24), recibidas.append, vista)
+    while not cargadas:
+        time.sleep(0.01)
+
+    for i in range(1, 6):
+        cache.solicitar(f"/{i}.mp3", (24, 24), recibidas.append, vista)
+    vista = cache.nueva_vista()
+    cache.solicitar("/6.mp3", (24, 24), recibidas.append, vista)
+    cache.solicitar("/7.mp3", (24, 24), recibidas.append, vista)
+    liberar.set()
+
+    esperar_resultados(cache, 8)
+    assert cargadas == ["/0.mp3", "/7.mp3", "/6.mp3"]
+    assert recibidas == [None, None, None]
+    assert not cache._callbacks and not cache._vigencia
+
+
+def test_las_solicitudes_sin_vista_no_caducan(tmp_path):
+    cache = CachePortadas(directorio_cache=str(tmp_path))
+    cache._cargar_miniatura = lambda ruta, tamano: None
+    recibidas = []
+    cache.solicitar("/portada.mp3", (64, 64), recibidas.append)
+    cache.nueva_vista()
+
+    esperar_resultados(cache, 1)
+    assert recibidas == [None]
+
+
+def test_poda_las_miniaturas_usadas_hace_mas_tiempo(tmp_path):
+    for i in range(10):
+        ruta = tmp_path / f"{i}.png"
+        ruta.write_bytes(b"x" * 1000)
+        os.utime(ruta, (i, i))
+    cache = CachePortadas(directorio_cache=str(tmp_path), max_bytes_disco=6200)
+
+    limite = time.time() + 5
+    while len(os.listdir(tmp_path)) > 3 and time.time() < limite:
+        time.sleep(0.01)
+    assert sorted(os.listdir(tmp_path)) == ["7.png", "8.png", "9.png"]
+    assert cache._bytes_disco == 3 * 1512
@@ -0,0 +1,162 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from SecondProyect import Cancion, DiarioCambios, GestorListas
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Agrega canciones sin parar y avisa por stdout cada vez que un lote queda en disco
+HIJO = """
+import sys
+from SecondProyect import Cancion, DiarioCambios, GestorListas
+gestor = GestorListas(diario=DiarioCambios(sys.argv[1], intervalo=0.002, max_entradas=150))
+gestor.crear_lista("l")
+lista = gestor.obtener_lista("l")
+i = 0
+while True:
+    lista.agregar_cancion(Cancion(f"t{i}", "Artista", 3.0, f"/t{i}.mp3", "Rock"))
+    i += 1
+    if i % 25 == 0:
+        gestor.diario.sincronizar()
+        print(i, flush=True)
+"""
+
+
+def esperar_compactacion(diario):
+    limite = time.monotonic() + 5
+    while diario._compactando and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert not diario._compactando
+
+
+def test_compactar_no_incluye_ediciones_posteriores(tmp_path, monkeypatch):
+    original = DiarioCambios._escribir_checkpoint
+
+    def checkpoint_lento(self, *args):
+        time.sleep(0.5)  # como si la biblioteca fuera enorme
+        original(self, *args)
+
+    monkeypatch.setattr(DiarioCambios, "_escribir_checkpoint", checkpoint_lento)
+    gestor = GestorListas(diario=DiarioCambios(str(tmp_path), intervalo=0.001))
+    gestor.crear_lista("l")
+    lista = gestor.obtener_lista("l")
+    lista.agregar_cancion(Cancion("A", "Artista", 3.0, "/a", "Rock"))
+    lista.agregar_cancion(Cancion("C", "Artista", 3.0, "/c", "Rock"))
+
+    gestor.compactar()
+    lista.agregar_cancion(Cancion("A", "Artista", 3.0, "/a2", "Rock"))
+    lista.editar_cancion(lista.buscar_cancion("A"), "X", "Artista", 3.0, "Rock")
+    esperar_compactacion(gestor.diario)
+    gestor.cerrar()
+
+    diario = DiarioCambios(str(tmp_path))
+    recuperada = diario.recuperar()["l"]
+    diario.cerrar()
+    assert [(c.titulo, c.ruta_archivo) for c in recuperada.iterar_canciones()] == [
+        ("X", "/a"), ("C", "/c"), ("A", "/a2")]
+
+
+def test_editar_se_reproduce_en_la_misma_posicion(tmp_path):
+    gestor = GestorListas(diario=DiarioCambios(str(tmp_path), intervalo=0.001))
+    gestor.crear_lista("l")
+    lista = gestor.obtener_lista("l")
+    for ruta in ("/a", "/a2"):
+        lista.agregar_cancion(Cancion("A", "Artista", 3.0, ruta, "Rock"))
+    lista.editar_cancion(lista.obtener_ventana(1, 1)[0], "X", "Artista", 3.0, "Rock")
+    gestor.cerrar()
+
+    diario = DiarioCambios(str(tmp_path))
+    recuperada = diario.recuperar()["l"]
+    diario.cerrar()
+    assert [(c.titulo, c.ruta_archivo) for c in recuperada.iterar_canciones()] == [("A", "/a"), ("X", "/a2")]
+
+
+def test_un_fallo_de_escritura_no_se_pierde_en_silencio(tmp_path):
+    diario = DiarioCambios(str(tmp_path), intervalo=0.001)
+    diario.recuperar()
+    diario.registrar({"op": "crear_lista", "lista": "l", "canciones": []})
+    diario.sincronizar()
+
+    diario._archivo.close()
+    diario.registrar({"op": "eliminar_lista", "lista": "l"})
+    with pytest.raises(RuntimeError):
+        diario.sincronizar()
+    assert diario.error is not None
+    with pytest.raises(RuntimeError):
+        diario.cerrar()
+
+
+def test_tras_un_fallo_los_cambios_siguen_en_memoria(tmp_path):
+    gestor = GestorListas(diario=DiarioCambios(str(tmp_path), intervalo=0.001))
+    for nombre in "ab":
+        gestor.crear_lista(nombre)
+    gestor.diario.sincronizar()
+    gestor.diario._archivo.close()
+    gestor.obtener_lista("a").agregar_cancion(Cancion("A", "Artista", 3.0, "/a", "Rock"))
+    with pytest.raises(RuntimeError):
+        gestor.diario.sincronizar()
+
+    # Las modificaciones no lanzan ni a medias: se aplican y el error queda en diario.error
+    assert gestor.eliminar_lista("b")
+    gestor.obtener_lista("a").agregar_cancion(Cancion("B", "Artista", 3.0, "/b", "Rock"))
+    assert gestor.obtener_listas() == ["a"] and len(gestor.obtener_lista("a")) == 2
+    assert gestor.diario._pendientes == []
+    with pytest.raises(RuntimeError):
+        gestor.cerrar()
+
+
+def test_un_checkpoint_fallido_queda_registrado(tmp_path):
+    diario = DiarioCambios(str(tmp_path), intervalo=0.001)
+    diario.recuperar()
+    diario.ruta_checkpoint = str(tmp_path / "no_existe" / "checkpoint.json")
+    diario.compactar([("l", [])])
+    esperar_compactacion(diario)
+    assert isinstance(diario.error_compactacion, OSError)
+    diario.cerrar()
+
+
+def test_una_entrada_que_no_aplica_no_impide_recuperar(tmp_path):
+    entradas = [
+        {"op": "crear_lista", "lista": "l", "canciones": [["A", "Artista", 3.0, "/a", "Rock"]], "s": 1},
+        {"op": "editar_cancion", "lista": "l", "indice": 7, "titulo": "A", "cambios": ["X", "", 1.0, ""], "s": 2},
+        {"op": "agregar_cancion", "lista": "l", "cancion": ["B"], "s": 3},
+        {"op": "agregar_cancion", "lista": "l", "cancion": ["C", "Artista", 3.0, "/c", "Rock"], "s": 4},
+    ]
+    with open(tmp_path / "diario.000001.log", "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(entrada) + "\n" for entrada in entradas)
+
+    diario = DiarioCambios(str(tmp_path))
+    lista = diario.recuperar()["l"]
+    diario.cerrar()
+    assert [c.titulo for c in lista.iterar_canciones()] == ["A", "C"]
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="requiere SIGKILL")
+def test_recupera_un_prefijo_tras_matar_el_proceso(tmp_path):
+    entorno = dict(os.environ, PYTHONPATH=RAIZ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    hijo = subprocess.Popen([sys.executable, "-c", HIJO, str(tmp_path)], stdout=subprocess.PIPE,
+                            env=entorno, text=True)
+    durables = 0
+    try:
+        for linea in hijo.stdout:
+            durables = int(linea)
+            if durables >= 2000:
+                break
+    finally:
+        os.kill(hijo.pid, signal.SIGKILL)
+        hijo.wait()
+    assert durables >= 2000
+
+    # Todo lo confirmado por sincronizar() sobrevive y lo recuperado no tiene huecos
+    diario = DiarioCambios(str(tmp_path))
+    lista = diario.recuperar()["l"]
+    diario.cerrar()
+    titulos = [c.titulo for c in lista.iterar_canciones()]
+    assert len(titulos) >= durables
+    assert titulos == [f"t{i}" for i in range(len(titulos))]
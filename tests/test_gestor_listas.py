@@ -0,0 +1,62 @@
+import os
+
+from SecondProyect import Cancion, GestorListas, ListaReproduccion, ReproductorApp
+
+
+def llenar(lista, prefijo, cantidad):
+    for i in range(cantidad):
+        lista.agregar_cancion(Cancion(f"{prefijo}{i}", "Artista", 3.0, f"/{prefijo}{i}.mp3", "Rock"))
+
+
+def test_tamano_estimado_se_mantiene_en_cada_cambio():
+    lista = ListaReproduccion()
+    llenar(lista, "t", 20)
+    lista.eliminar_cancion("t3")
+    lista.editar_cancion(lista.buscar_cancion("t5"), "un título bastante más largo", "Otro", 1.0, "Pop")
+
+    esperado = sum(c.tamano_estimado() for c in lista.iterar_canciones())
+    assert lista.tamano_estimado() == esperado
+
+
+def test_desaloja_la_menos_usada_y_recarga_desde_disco():
+    gestor = GestorListas(presupuesto_memoria=1)
+    for nombre in "abc":
+        gestor.crear_lista(nombre)
+        llenar(gestor.obtener_lista(nombre), nombre, 5)
+    gestor.seleccionar_lista("c")
+
+    estadisticas = gestor.obtener_estadisticas_memoria()
+    assert estadisticas["residentes"] == 1
+    assert gestor.listas["a"] is None and gestor.listas["c"] is gestor.lista_activa
+
+    assert [c.titulo for c in gestor.obtener_lista("a").iterar_canciones()] == [f"a{i}" for i in range(5)]
+    assert gestor.obtener_estadisticas_memoria()["cargas_desde_disco"] == 1
+    gestor.cerrar()
+
+
+def test_cerrar_borra_el_directorio_temporal():
+    gestor = GestorListas(presupuesto_memoria=1)
+    gestor.crear_lista("a")
+    llenar(gestor.obtener_lista("a"), "a", 3)
+    gestor.crear_lista("b")
+    gestor.seleccionar_lista("b")
+    directorio = gestor.directorio_cache
+    assert os.listdir(directorio)
+
+    gestor.cerrar()
+    assert not os.path.exists(directorio)
+
+
+def test_el_control_remoto_consulta_y_ajusta_el_presupuesto():
+    app = ReproductorApp.__new__(ReproductorApp)
+    app.gestor = GestorListas()
+    for nombre in "ab":
+        app.gestor.crear_lista(nombre)
+        llenar(app.gestor.obtener_lista(nombre), nombre, 5)
+    app.gestor.seleccionar_lista("b")
+    assert app.ejecutar_comando("memory", {})["residentes"] == 2
+
+    estadisticas = app.ejecutar_comando("memory", {"presupuesto": 1})
+    assert estadisticas["presupuesto"] == 1
+    assert estadisticas["residentes"] == 1 and estadisticas["desalojos"] == 1
+    app.gestor.cerrar()
@@ -0,0 +1,59 @@
+from SecondProyect import Cancion, ListaReproduccion
+
+
+def crear_lista(*titulos):
+    lista = ListaReproduccion()
+    for titulo in titulos:
+        lista.agregar_cancion(Cancion(titulo, "Artista", 3.0, f"/{titulo}.mp3", "Rock"))
+    return lista
+
+
+def test_instantanea_no_cambia_con_mutaciones_posteriores():
+    lista = crear_lista("A", "B", "C")
+    instantanea = lista.obtener_instantanea()
+
+    lista.agregar_cancion(Cancion("D", "Artista", 1.0, "/D.mp3", "Rock"))
+    lista.eliminar_cancion("B")
+    lista.editar_cancion(lista.buscar_cancion("A"), "X", "Otro", 2.0, "Pop")
+
+    assert [fila[0] for fila in instantanea] == ["A", "B", "C"]
+    assert [fila[0] for fila in lista.obtener_instantanea()] == ["X", "C", "D"]
+    assert lista.obtener_instantanea()[0] == ("X", "Otro", 2.0, "/A.mp3", "Pop")
+
+
+def test_instantanea_se_comparte_hasta_el_siguiente_cambio():
+    lista = crear_lista("A", "B")
+    primera = lista.obtener_instantanea()
+    assert lista.obtener_instantanea() is primera
+
+    lista.agregar_cancion(Cancion("C", "Artista", 1.0, "/C.mp3", "Rock"))
+    assert lista.obtener_instantanea() is not primera
+
+
+def test_longitud_y_ventana():
+    lista = crear_lista(*[str(i) for i in range(10)])
+    lista.eliminar_cancion("3")
+
+    assert len(lista) == 9
+    assert [c.titulo for c in lista.obtener_ventana(2, 3)] == ["2", "4", "5"]
+    assert [c.titulo for c in lista.obtener_ventana(7, 5)] == ["8", "9"]
+
+
+def test_filas_por_posicion():
+    lista = crear_lista(*[str(i) for i in range(10)])
+    assert [fila[0] for fila in lista.obtener_filas(8, 5)] == ["8", "9"]
+    assert lista.obtener_filas(20, 5) == []
+
+
+def test_editar_una_cancion_ya_eliminada_no_cambia_nada():
+    lista = ListaReproduccion()
+    for titulo, ruta in (("A", "/a"), ("B", "/b"), ("A", "/a2")):
+        lista.agregar_cancion(Cancion(titulo, "Artista", 3.0, ruta, "Rock"))
+    cancion = lista.buscar_cancion("A")
+    cambios = []
+    lista.al_cambiar = cambios.append
+    lista.eliminar_cancion("A")
+
+    assert not lista.editar_cancion(cancion, "Z", "Otro", 1.0, "Pop")
+    assert lista.duracion_total == 6.0 and len(cambios) == 1
+    assert [fila[0] for fila in lista.obtener_instantanea()] == ["B", "A"]
@@ -0,0 +1,126 @@
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from SecondProyect import ServidorControl
+
+
+class TkSimulado:
+    # Hace de hilo de Tk: procesa la cola solo cuando el servidor lo despierta
+    def __init__(self):
+        self.servidor = None
+        self.avisos = 0
+        self.evento = threading.Event()
+        threading.Thread(target=self._bucle, daemon=True).start()
+
+    def despertar(self):
+        self.avisos += 1
+        self.evento.set()
+
+    def _bucle(self):
+        while True:
+            self.evento.wait()
+            self.evento.clear()
+            while self.servidor.procesar_comandos():
+                pass
+
+
+@pytest.fixture
+def ruta_socket(tmp_path):
+    return str(tmp_path / "control.sock")
+
+
+def conectar(ruta):
+    cliente = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    cliente.connect(ruta)
+    return cliente, cliente.makefile("rb")
+
+
+def test_comandos_encadenados_despiertan_a_tk_sin_sondeo(ruta_socket):
+    tk_simulado = TkSimulado()
+    servidor = ServidorControl(lambda comando, args: {"cmd": comando}, ruta_socket, tk_simulado.despertar)
+    tk_simulado.servidor = servidor
+    servidor.iniciar()
+    try:
+        cliente, archivo = conectar(ruta_socket)
+        cliente.sendall(b"".join(json.dumps({"id": i, "cmd": "state"}).encode() + b"\n" for i in range(200)))
+        respuestas = [json.loads(archivo.readline()) for _ in range(200)]
+        assert [r["id"] for r in respuestas] == list(range(200))
+        assert all(r["ok"] for r in respuestas)
+        assert 1 <= tk_simulado.avisos <= 200
+
+        inicio = time.perf_counter()
+        cliente.sendall(b'{"id": "x", "cmd": "play"}\n')
+        assert json.loads(archivo.readline())["resultado"] == {"cmd": "play"}
+        assert time.perf_counter() - inicio < 0.5
+        cliente.close()
+    finally:
+        servidor.detener()
+
+
+def test_error_al_abrir_el_socket_no_bloquea(tmp_path):
+    servidor = ServidorControl(lambda comando, args: {}, str(tmp_path / "no_existe" / "control.sock"))
+    resultado = []
+
+    def iniciar():
+        try:
+            servidor.iniciar()
+        except OSError as e:
+            resultado.append(e)
+
+    hilo = threading.Thread(target=iniciar, daemon=True)
+    hilo.start()
+    hilo.join(3)
+    assert not hilo.is_alive()
+    assert resultado
+
+
+def test_reemplaza_socket_abandonado_pero_no_uno_activo(ruta_socket):
+    abandonado = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    abandonado.bind(ruta_socket)
+    abandonado.close()
+
+    primero = ServidorControl(lambda comando, args: {}, ruta_socket)
+    primero.iniciar()
+    try:
+        segundo = ServidorControl(lambda comando, args: {}, ruta_socket)
+        with pytest.raises(RuntimeError):
+            segundo.iniciar()
+        assert os.path.exists(ruta_socket)
+        cliente, _ = conectar(ruta_socket)
+        cliente.close()
+    finally:
+        primero.detener()
+
+
+def test_el_socket_solo_es_accesible_para_el_usuario(ruta_socket):
+    servidor = ServidorControl(lambda comando, args: {}, ruta_socket)
+    servidor.iniciar()
+    try:
+        assert os.stat(ruta_socket).st_mode & 0o777 == 0o600
+    finally:
+        servidor.detener()
+
+
+def test_desconecta_a_un_suscriptor_que_no_lee(ruta_socket):
+    servidor = ServidorControl(lambda comando, args: {}, ruta_socket)
+    servidor.iniciar()
+    try:
+        cliente, archivo = conectar(ruta_socket)
+        cliente.sendall(b'{"id": 1, "cmd": "subscribe"}\n')
+        assert json.loads(archivo.readline())["ok"]
+
+        # El cliente deja de leer; el búfer del servidor no puede crecer sin límite
+        for _ in range(2000):
+            servidor.notificar({"evento": "estado", "relleno": "x" * 4096})
+        limite = time.monotonic() + 5
+        while servidor.hay_suscriptores and time.monotonic() < limite:
+            time.sleep(0.01)
+        assert not servidor.hay_suscriptores
+        cliente.close()
+    finally:
+        servidor.detener()
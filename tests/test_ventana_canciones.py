@@ -0,0 +1,98 @@
+from SecondProyect import ALTO_FILA_LISTA, Cancion, ListaReproduccion, ReproductorApp
+
+
+class TablaSimulada:
+    # Lo mínimo de ttk.Treeview que usa la ventana de canciones
+    def __init__(self, filas_visibles):
+        self.alto = (filas_visibles + 1) * ALTO_FILA_LISTA
+        self.items = {}
+        self.orden = []
+        self.seleccion = ()
+        self.creados = 0
+
+    def winfo_height(self):
+        return self.alto
+
+    def insert(self, padre, posicion, **opciones):
+        self.creados += 1
+        item = f"I{self.creados}"
+        self.items[item] = dict(opciones)
+        self.orden.append(item)
+        return item
+
+    def delete(self, *items):
+        for item in items:
+            del self.items[item]
+            self.orden.remove(item)
+
+    def item(self, item, **opciones):
+        self.items[item].update(opciones)
+
+    def selection(self):
+        return self.seleccion
+
+    def selection_set(self, item):
+        self.seleccion = (item,)
+
+    def selection_remove(self, *items):
+        self.seleccion = ()
+
+    def titulos(self):
+        return [self.items[item]["values"][0] for item in self.orden]
+
+
+class BarraSimulada:
+    def set(self, primero, ultimo):
+        self.posicion = (primero, ultimo)
+
+
+def crear_app(lista, filas_visibles=5):
+    app = ReproductorApp.__new__(ReproductorApp)
+    app.tree = TablaSimulada(filas_visibles)
+    app.scroll_tree = BarraSimulada()
+    app.mostrar_miniaturas = False
+    app.filas_canciones, app.rutas_filas = [], {}
+    app.inicio_ventana, app.indice_seleccionado = 0, None
+    app.lista_mostrada, app.generacion_mostrada = None, -1
+    app.gestor = type("Gestor", (), {"lista_activa": lista})()
+    return app
+
+
+def test_solo_se_crean_las_filas_visibles():
+    lista = ListaReproduccion()
+    for i in range(10000):
+        lista.agregar_cancion(Cancion(f"t{i}", "Artista", 3.0, f"/t{i}.mp3", "Rock"))
+    app = crear_app(lista)
+    app.actualizar_canciones()
+    assert app.tree.titulos() == [f"t{i}" for i in range(5)]
+
+    app.desplazar_lista("moveto", "0.5")
+    assert app.tree.titulos() == [f"t{i}" for i in range(5000, 5005)]
+    assert app.scroll_tree.posicion == (0.5, 0.5005)
+    app.desplazar_lista("scroll", "1", "pages")
+    assert app.tree.titulos()[0] == "t5005"
+    app.desplazar_lista("moveto", "1.0")
+    assert app.tree.titulos()[-1] == "t9999"
+    assert app.tree.creados == 5
+
+
+def test_la_seleccion_sigue_a_la_cancion_al_desplazarse():
+    lista = ListaReproduccion()
+    for i in range(20):
+        lista.agregar_cancion(Cancion(f"t{i}", "Artista", 3.0, f"/t{i}.mp3", "Rock"))
+    app = crear_app(lista)
+    app.actualizar_canciones()
+
+    for _ in range(7):
+        app.mover_seleccion(1)
+    assert app.indice_seleccionado == 6 and app.inicio_ventana == 2
+    assert app.tree.items[app.tree.selection()[0]]["values"][0] == "t6"
+
+    app.desplazar_lista("scroll", "10", "units")
+    assert app.tree.selection() == ()
+    app.desplazar_lista("scroll", "-10", "units")
+    assert app.tree.items[app.tree.selection()[0]]["values"][0] == "t6"
+
+    lista.eliminar_cancion("t1")
+    app.actualizar_canciones()
+    assert app.tree.titulos() == ["t3", "t4", "t5", "t6", "t7"]  # se conserva la posición